@@ -0,0 +1,137 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from build_cache import hash_bytes, hash_file
+from gencontent import (BATCH_BYTES, find_pages, init_worker, layout_for, load_layouts, merge_worker_caches,
+                        render_batch_in_worker, select_shard, source_name, worker_initargs, write_page)
+from link_index import page_url
+from markdown_blocks import MMAP_THRESHOLD
+
+_DONE = object() #Queue sentinel, one per consumer
+
+def read_source(path, need_hash):
+    #(size, hash, bytes) of a source from one read, the hash matches
+    #hash_file. Sources iter_file_blocks would map are left for the renderer
+    #to stream, their bytes are None.
+    size = os.path.getsize(path)
+    if size >= MMAP_THRESHOLD:
+        return size, hash_file(path) if need_hash else None, None
+    with open(path, "rb") as file:
+        data = file.read()
+    return len(data), hash_bytes(data) if need_hash else None, data
+
+async def build_async(content_dir, template_path, dest_dir, cache=None, jobs=1, io_threads=8, queue_size=32,
+                      link_index=None, output=None, shard=None, batch_bytes=BATCH_BYTES, layouts=None):
+    #Hashing, rendering and writing run as three stages joined by bounded queues,
+    #so slow disks are read and written while other pages are parsed.
+    #Each source is read once on the i/o threads, and its bytes are both
+    #hashed and sent to the renderer, so queue_size bounds the batches held.
+    #Pages are rendered in batches like render_pages.
+    loop = asyncio.get_running_loop()
+    write = write_page if output is None else output.write
+    index = link_index is not None
+    pages = select_shard(find_pages(content_dir, dest_dir), content_dir, shard)
+    read_queue = asyncio.Queue()
+    render_queue = asyncio.Queue(maxsize=queue_size)
+    write_queue = asyncio.Queue(maxsize=queue_size)
+    for page in pages:
+        read_queue.put_nowait(page)
+
+    io_pool = ThreadPoolExecutor(max_workers=io_threads)
+    if jobs > 1:
+        cpu_pool = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                       initargs=worker_initargs())
+    else:
+        #A single render thread still lets the event loop keep i/o moving
+        cpu_pool = ThreadPoolExecutor(max_workers=1)
+    written = 0
+    batch = [] #Pages waiting for a render batch, filled by every reader
+    batch_size = 0
+
+    async def reader():
+        nonlocal batch, batch_size
+        while not read_queue.empty():
+            from_path, dest_path = read_queue.get_nowait()
+            layout = layout_for(source_name(from_path, content_dir), template_path, layouts)
+            size, source_hash, source = await loop.run_in_executor(io_pool, read_source, from_path, cache is not None)
+            if cache is not None:
+                html = cache.lookup(from_path, source_hash, need_index=index, template=layout)
+                if html is not None:
+                    if index:
+                        link_index.add_rendered_page(page_url(dest_path, dest_dir), *cache.page_index(from_path))
+                    if output is not None or not os.path.exists(dest_path):
+                        await write_queue.put((from_path, dest_path, source_hash, layout, html, None, False))
+                    continue
+            batch.append((from_path, dest_path, source_hash, layout, source))
+            batch_size += size
+            if batch_size >= batch_bytes:
+                full, batch, batch_size = batch, [], 0
+                await render_queue.put(full)
+
+    async def renderer():
+        while True:
+            item = await render_queue.get()
+            if item is _DONE:
+                return
+            #Links are collected by the render worker, not on the event loop
+            pages = [(from_path, templates[layout]) if source is None else (from_path, templates[layout], source)
+                     for from_path, _, _, layout, source in item]
+            rendered, new_blocks, counts = await loop.run_in_executor(cpu_pool, render_batch_in_worker, pages, index)
+            if jobs > 1:
+                merge_worker_caches(new_blocks, counts) #A render thread already used this process's caches
+            for (from_path, dest_path, source_hash, layout, _), (html, page_index) in zip(item, rendered):
+                if index:
+                    link_index.add_rendered_page(page_url(dest_path, dest_dir), *page_index)
+                await write_queue.put((from_path, dest_path, source_hash, layout, html, page_index, True))
+
+    async def writer():
+        nonlocal written
+        while True:
+            item = await write_queue.get()
+            if item is _DONE:
+                return
+            from_path, dest_path, source_hash, layout, html, page_index, rendered = item
+            await loop.run_in_executor(io_pool, write, dest_path, html)
+            if rendered:
+                if cache is not None:
+                    cache.store(from_path, source_hash, list(templates[layout].deps), html, page_index, layout)
+                written += 1
+            elif output is None:
+                written += 1
+
+    renderer_count = max(1, jobs) * 2 #Keeps every render worker busy
+
+    async def read_all():
+        await asyncio.gather(*(reader() for _ in range(io_threads)))
+        if batch:
+            await render_queue.put(batch)
+        for _ in range(renderer_count):
+            await render_queue.put(_DONE)
+
+    async def render_all():
+        await asyncio.gather(*(renderer() for _ in range(renderer_count)))
+        for _ in range(io_threads):
+            await write_queue.put(_DONE)
+
+    try:
+        templates = await loop.run_in_executor(io_pool, load_layouts, template_path, layouts)
+        #A failing stage cancels the others instead of leaving them blocked
+        async with asyncio.TaskGroup() as group:
+            group.create_task(read_all())
+            group.create_task(render_all())
+            for _ in range(io_threads):
+                group.create_task(writer())
+    except ExceptionGroup as errors:
+        raise errors.exceptions[0]
+    finally:
+        io_pool.shutdown()
+        cpu_pool.shutdown()
+
+    return written
+
+def generate_pages_async(content_dir, template_path, dest_dir, cache=None, jobs=1, io_threads=8,
+                         link_index=None, output=None, shard=None, batch_bytes=BATCH_BYTES, layouts=None):
+    return asyncio.run(build_async(content_dir, template_path, dest_dir, cache, jobs, io_threads,
+                                   link_index=link_index, output=output, shard=shard, batch_bytes=batch_bytes,
+                                   layouts=layouts))
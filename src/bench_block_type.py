@@ -0,0 +1,73 @@
+import random
+import re
+import timeit
+
+from enums import BlockType
+from markdown_blocks import block_to_block_type
+
+#The classifier as it was before the first-character dispatcher, kept as
+#the baseline for this benchmark
+def legacy_block_to_block_type(block):
+    if re.match(r"(^#{1,6})\s", block):
+        return BlockType.HEADING
+    if block.startswith("```") and block.endswith("```"):
+        return BlockType.CODE
+    lines = block.split("\n")
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith("- ") for line in lines):
+        return BlockType.UNORDERED_LIST
+    expected_number = 1
+    for line in lines:
+        match = re.match(r"^(\d+)\.\s", line)
+        if match:
+            if int(match.group(1)) != expected_number:
+                break
+            expected_number += 1
+        else:
+            break
+    else:
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+def make_corpus(blocks=5000, paragraph_ratio=0.8, seed=0):
+    rng = random.Random(seed)
+    words = ["static", "site", "markdown", "block", "**bold**", "_italic_", "`code`", "text"]
+
+    def sentence():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(5, 15)))
+
+    corpus = []
+    for _ in range(blocks):
+        if rng.random() < paragraph_ratio:
+            corpus.append("\n".join(sentence() for _ in range(rng.randint(1, 6))))
+            continue
+        lines = rng.randint(1, 6)
+        match rng.randrange(5):
+            case 0:
+                corpus.append("#" * rng.randint(1, 6) + " " + sentence())
+            case 1:
+                corpus.append("```\n" + "\n".join(sentence() for _ in range(lines)) + "\n```")
+            case 2:
+                corpus.append("\n".join("> " + sentence() for _ in range(lines)))
+            case 3:
+                corpus.append("\n".join("- " + sentence() for _ in range(lines)))
+            case 4:
+                corpus.append("\n".join(f"{i}. {sentence()}" for i in range(1, lines + 1)))
+    return corpus
+
+def run(repeat=5, number=20):
+    corpus = make_corpus()
+    for block in corpus:
+        assert legacy_block_to_block_type(block) == block_to_block_type(block)
+
+    results = {}
+    for name, func in (("legacy", legacy_block_to_block_type), ("current", block_to_block_type)):
+        timer = timeit.Timer(lambda: [func(block) for block in corpus])
+        results[name] = min(timer.repeat(repeat, number)) / number
+        print(f"{name:>8}: {results[name] * 1000:.3f} ms per {len(corpus)} blocks")
+    print(f"speedup: {results['legacy'] / results['current']:.2f}x")
+    return results
+
+if __name__ == "__main__":
+    run()
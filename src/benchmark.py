@@ -0,0 +1,220 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from enums import BlockType
+from inline_parser import parse_inline
+from markdown_blocks import markdown_to_blocks, block_to_block_type, markdown_to_html_node, ordered_item_text
+
+WORDS = [
+    "static", "site", "generator", "markdown", "page", "block", "inline",
+    "render", "build", "output", "template", "content", "parser", "node",
+]
+
+def generate_corpus(pages=100, page_size=40, link_density=0.05, nesting_depth=2,
+                    code_ratio=0.1, seed=0):
+    #page_size is the number of blocks per page, link_density the chance that
+    #a word is a link or image, nesting_depth the deepest quote marker (>>)
+    rng = random.Random(seed)
+
+    def word():
+        roll = rng.random()
+        if roll < link_density:
+            if rng.random() < 0.2:
+                return f"![{rng.choice(WORDS)}](/images/{rng.choice(WORDS)}.png)"
+            return f"[{rng.choice(WORDS)}](/{rng.choice(WORDS)}/{rng.randrange(1000)})"
+        match rng.randrange(20):
+            case 0:
+                return f"**{rng.choice(WORDS)}**"
+            case 1:
+                return f"_{rng.choice(WORDS)}_"
+            case 2:
+                return f"`{rng.choice(WORDS)}`"
+        return rng.choice(WORDS)
+
+    def sentence():
+        return " ".join(word() for _ in range(rng.randint(6, 18)))
+
+    def block():
+        if rng.random() < code_ratio:
+            lines = [" ".join(rng.choice(WORDS) for _ in range(6)) for _ in range(rng.randint(2, 12))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        lines = rng.randint(1, 6)
+        match rng.randrange(8):
+            case 0:
+                return "#" * rng.randint(2, 6) + " " + sentence()
+            case 1:
+                depth = rng.randint(1, max(1, nesting_depth))
+                return "\n".join(">" * depth + " " + sentence() for _ in range(lines))
+            case 2:
+                return "\n".join("- " + sentence() for _ in range(lines))
+            case 3:
+                return "\n".join(f"{i}. {sentence()}" for i in range(1, lines + 1))
+        return "\n".join(sentence() for _ in range(lines))
+
+    corpus = []
+    for number in range(pages):
+        blocks = [f"# Page {number}"] + [block() for _ in range(page_size - 1)]
+        corpus.append("\n\n".join(blocks) + "\n")
+    return corpus
+
+def pathological_inputs(size=20000):
+    #Inline markdown built to make a parser rescan or backtrack, about size
+    #characters each. Delimiters that never match are the usual culprits.
+    units = {
+        "unmatched_underscores": "_",
+        "unmatched_bold": "**a ",
+        "closers_only": "a** ",
+        "unmatched_brackets": "[",
+        "unmatched_images": "![",
+        "unclosed_destinations": "[a](",
+        "brackets_without_links": "[a]",
+        "mixed_delimiters": "**_[`",
+    }
+    cases = {name: unit * (size // len(unit)) for name, unit in units.items()}
+    cases["deep_emphasis"] = "**_" * (size // 6) + "x" + "_**" * (size // 6)
+    cases["nested_link_brackets"] = "[" * (size // 5) + "a" + "](u)" * (size // 5)
+    cases["nested_images"] = "![" * (size // 6) + "x" + "](u)" * (size // 6)
+    return cases
+
+def render_inline(text):
+    return "".join(node.to_html() for node in parse_inline(text))
+
+def run_pathological(size=20000, repeat=3):
+    results = {}
+    for name, text in pathological_inputs(size).items():
+        seconds, _ = time_stage(lambda: render_inline(text), repeat)
+        results[name] = {"seconds": seconds, "chars": len(text)}
+    return results
+
+def block_inline_texts(block, block_type):
+    #The inline markdown of a block, as the html converters pass it on
+    lines = block.split("\n")
+    match block_type:
+        case BlockType.CODE:
+            return []
+        case BlockType.HEADING:
+            return [block.lstrip("#")[1:]]
+        case BlockType.QUOTE:
+            return [" ".join(line.lstrip(">").strip() for line in lines)]
+        case BlockType.UNORDERED_LIST:
+            return [line[2:] for line in lines]
+        case BlockType.ORDERED_LIST:
+            return [ordered_item_text(line) for line in lines]
+    return [" ".join(lines)]
+
+def time_stage(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def run_benchmark(corpus, repeat=3):
+    stages = {}
+
+    def record(name, func, count):
+        seconds, result = time_stage(func, repeat)
+        items = count(result)
+        stages[name] = {
+            "seconds": seconds,
+            "items": items,
+            "us_per_item": seconds / items * 1e6 if items else 0.0,
+        }
+        return result
+
+    blocks = record("markdown_to_blocks",
+                    lambda: [markdown_to_blocks(page) for page in corpus],
+                    lambda result: sum(len(page) for page in result))
+    all_blocks = [block for page in blocks for block in page]
+
+    block_types = record("block_to_block_type",
+                         lambda: [block_to_block_type(block) for block in all_blocks],
+                         len)
+
+    texts = [text for block, block_type in zip(all_blocks, block_types)
+             for text in block_inline_texts(block, block_type)]
+    record("parse_inline",
+           lambda: [node for text in texts for node in parse_inline(text)],
+           len)
+
+    trees = record("markdown_to_html_node",
+                   lambda: [markdown_to_html_node(page) for page in corpus],
+                   len)
+
+    record("to_html",
+           lambda: [tree.to_html() for tree in trees],
+           lambda result: sum(len(html) for html in result))
+    stages["to_html"]["bytes"] = stages["to_html"].pop("items")
+
+    return stages
+
+def compare(old, new):
+    #Ratio above 1 means the new run is slower
+    lines = []
+    for section in ("stages", "pathological"):
+        for name, stage in new.get(section, {}).items():
+            if name not in old.get(section, {}):
+                continue
+            old_seconds = old[section][name]["seconds"]
+            if old_seconds <= 0: #Too fast to time, there is nothing to divide by
+                lines.append(f"{name:<24} {'n/a':>7}")
+                continue
+            ratio = stage["seconds"] / old_seconds
+            lines.append(f"{name:<24} {ratio:6.2f}x")
+    return "\n".join(lines)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Time each stage of the markdown pipeline")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=40, help="blocks per page")
+    parser.add_argument("--link-density", type=float, default=0.05)
+    parser.add_argument("--nesting-depth", type=int, default=2)
+    parser.add_argument("--code-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pathological-size", type=int, default=20000,
+                        help="characters in each adversarial inline input, 0 skips them")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    config = {
+        "pages": args.pages,
+        "page_size": args.page_size,
+        "link_density": args.link_density,
+        "nesting_depth": args.nesting_depth,
+        "code_ratio": args.code_ratio,
+        "seed": args.seed,
+    }
+    corpus = generate_corpus(**config)
+    results = {
+        "config": config,
+        "python": platform.python_version(),
+        "corpus_bytes": sum(len(page) for page in corpus),
+        "stages": run_benchmark(corpus, args.repeat),
+    }
+    if args.pathological_size:
+        results["pathological"] = run_pathological(args.pathological_size, args.repeat)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            print(compare(json.load(file), results), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
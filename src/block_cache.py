@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import zlib
+from collections import OrderedDict
+
+from enums import TextType
+
+CACHE_VERSION = 6
+
+def block_key(block, block_type):
+    digest = hashlib.blake2b(block.encode("utf-8"), digest_size=16)
+    digest.update(block_type.value.encode("utf-8"))
+    return digest.hexdigest()
+
+class BlockCache():
+    #Rendered html and the links in it per block, keyed by a digest of the
+    #block text and type. Least recently used blocks are evicted past
+    #max_bytes of html. With track_new, new entries are also kept for
+    #take_new until a worker process hands them to its parent.
+    def __init__(self, path=None, max_bytes=64 * 1024 * 1024, track_new=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.track_new = track_new
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._new = [] #Entries added since the last take_new()
+        if path is not None:
+            self.load()
+
+    def get(self, block, block_type):
+        #Returns (html, links) or None
+        key = block_key(block, block_type)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, block, block_type, html, links=()):
+        #links are (target, text, TextType) as text_to_children collects them
+        key = block_key(block, block_type)
+        entry = (html, tuple(links))
+        self._add(key, entry)
+        if self.track_new:
+            self._new.append((key, entry))
+
+    def _add(self, key, entry):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old[0])
+        self._entries[key] = entry
+        self.size += len(entry[0])
+        while self.size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted[0])
+
+    def take_new(self):
+        #Lets worker processes hand their new blocks back to the parent
+        new = self._new
+        self._new = []
+        return new
+
+    def merge(self, entries):
+        for key, html in entries:
+            self._add(key, html)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as file:
+                data = json.loads(zlib.decompress(file.read()))
+        except (OSError, ValueError, zlib.error):
+            return #A broken cache is the same as no cache
+        if data.get("version") == CACHE_VERSION:
+            self.merge((key, (html, tuple((target, text, TextType(text_type)) for target, text, text_type in links)))
+                       for key, html, links in data["entries"])
+
+    def save(self):
+        #Entries are stored oldest first, so loading keeps the LRU order
+        entries = [[key, html, [[target, text, text_type.value] for target, text, text_type in links]]
+                   for key, (html, links) in self._entries.items()]
+        data = {"version": CACHE_VERSION, "entries": entries}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8")))
+        os.replace(tmp_path, self.path)
+
+#Used by markdown_to_html when set, off unless a build opts in
+BLOCK_CACHE = None
+
+def enable_block_cache(path=None, max_bytes=64 * 1024 * 1024, track_new=False):
+    global BLOCK_CACHE
+    BLOCK_CACHE = BlockCache(path, max_bytes, track_new)
+    return BLOCK_CACHE
+
+def disable_block_cache():
+    global BLOCK_CACHE
+    cache = BLOCK_CACHE
+    BLOCK_CACHE = None
+    return cache
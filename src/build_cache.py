@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+
+from enums import TextType
+
+CACHE_VERSION = 10
+
+def hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def hash_file(path):
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+def hash_bytes(data):
+    #hash_file of a file holding data
+    return hashlib.sha256(data).hexdigest()
+
+class BuildCache():
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dep_hashes = {} #Each dependency is hashed once per build
+        self._seen = set()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return #A broken cache is the same as no cache
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("pages", {})
+
+    def save(self):
+        #Drop pages that were not part of this build
+        pages = {source: entry for source, entry in self.entries.items()
+                 if source in self._seen}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"version": CACHE_VERSION, "pages": pages}, file)
+        os.replace(tmp_path, self.path)
+
+    def dep_hash(self, path):
+        if path not in self._dep_hashes:
+            self._dep_hashes[path] = hash_file(path)
+        return self._dep_hashes[path]
+
+    def lookup(self, source, source_hash, need_index=False, template=None):
+        #Returns the cached html, or None if the page, its template or a
+        #dependency changed. With need_index, pages cached without their link
+        #index miss too.
+        self._seen.add(source)
+        entry = self.entries.get(source)
+        if (entry is None or entry["hash"] != source_hash or (need_index and "index" not in entry)
+                or entry.get("template") != template):
+            self.misses += 1
+            return None
+        for dep, dep_hash in entry["deps"].items():
+            if not os.path.exists(dep) or self.dep_hash(dep) != dep_hash:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry["html"]
+
+    def store(self, source, source_hash, deps, html, page_index=None, template=None):
+        #page_index is the (title, heading ids, links) the link index needs,
+        #template the path of the layout the page was rendered with
+        self._seen.add(source)
+        entry = {
+            "hash": source_hash,
+            "deps": {dep: self.dep_hash(dep) for dep in deps},
+            "html": html,
+            "template": template,
+        }
+        if page_index is not None:
+            title, anchors, links = page_index
+            entry["index"] = [title, list(anchors),
+                              [[target, text, text_type.value] for target, text, text_type in links]]
+        self.entries[source] = entry
+
+    def page_index(self, source):
+        title, anchors, links = self.entries[source]["index"]
+        return title, anchors, [(target, text, TextType(text_type)) for target, text, text_type in links]
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+COMPARE_MODES = ("size", "mtime", "hash")
+
+def list_files(root):
+    #Relative paths of every file below root
+    files = set()
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            files.add(os.path.relpath(os.path.join(dir_path, file_name), root))
+    return files
+
+def _hash(path):
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").digest()
+
+def is_unchanged(src_path, dest_path, compare="mtime"):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src_path)
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if compare == "size":
+        return True
+    if compare == "mtime":
+        return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+    return _hash(src_path) == _hash(dest_path)
+
+def copy_file(src_path, dest_path):
+    #A unique temp name, so it cannot clash with a static file called x.tmp
+    #that another copy thread is writing
+    dest = tempfile.NamedTemporaryFile(dir=os.path.dirname(dest_path) or ".", prefix=".",
+                                       suffix=".tmp", delete=False)
+    try:
+        with open(src_path, "rb") as src, dest:
+            _copy_fd(src.fileno(), dest.fileno(), os.fstat(src.fileno()).st_size)
+        shutil.copystat(src_path, dest.name) #Keeps mtime so the next sync can compare
+        os.replace(dest.name, dest_path)
+    except BaseException:
+        os.remove(dest.name)
+        raise
+
+def _copy_fd(src_fd, dest_fd, size):
+    #Copy inside the kernel where the OS allows it: copy_file_range can
+    #reflink on filesystems that support it, sendfile skips user space.
+    #Each fallback starts over from an empty destination.
+    if hasattr(os, "copy_file_range"):
+        try:
+            _copy_loop(lambda done: os.copy_file_range(src_fd, dest_fd, size - done), size)
+            return
+        except OSError:
+            _rewind(src_fd, dest_fd)
+    if hasattr(os, "sendfile"):
+        try:
+            _copy_loop(lambda done: os.sendfile(dest_fd, src_fd, done, size - done), size)
+            return
+        except OSError:
+            _rewind(src_fd, dest_fd)
+    while True:
+        chunk = os.read(src_fd, 1024 * 1024)
+        if not chunk:
+            return
+        os.write(dest_fd, chunk)
+
+def _copy_loop(copy_chunk, size):
+    done = 0
+    while done < size:
+        count = copy_chunk(done)
+        if count == 0:
+            break
+        done += count
+
+def _rewind(src_fd, dest_fd):
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    os.lseek(dest_fd, 0, os.SEEK_SET)
+    os.ftruncate(dest_fd, 0)
+
+def sync_static(src_dir, dest_dir, compare="mtime", threads=8, keep=(), output=None):
+    #Copies new and changed files and deletes files that are no longer in
+    #src_dir, except the relative paths in keep (e.g. generated pages).
+    #An OutputWriter gets every copy and removal for its changed manifest.
+    if compare not in COMPARE_MODES:
+        raise ValueError(f"compare must be one of {', '.join(COMPARE_MODES)}")
+
+    src_files = list_files(src_dir)
+    dest_files = list_files(dest_dir) if os.path.isdir(dest_dir) else set()
+    keep = set(keep)
+    stats = {"copied": 0, "unchanged": 0, "removed": 0}
+
+    #Remove stale files first so a file can be replaced by a directory
+    for rel_path in sorted(dest_files - src_files - keep):
+        os.remove(os.path.join(dest_dir, rel_path))
+        stats["removed"] += 1
+        if output is not None:
+            output.record_removal(os.path.join(dest_dir, rel_path))
+    _remove_empty_dirs(dest_dir)
+
+    to_copy = []
+    for rel_path in sorted(src_files):
+        src_path = os.path.join(src_dir, rel_path)
+        dest_path = os.path.join(dest_dir, rel_path)
+        if os.path.isdir(dest_path):
+            shutil.rmtree(dest_path)
+        if is_unchanged(src_path, dest_path, compare):
+            stats["unchanged"] += 1
+            continue
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        to_copy.append((src_path, dest_path))
+
+    if threads > 1 and len(to_copy) > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda paths: copy_file(*paths), to_copy))
+    else:
+        for src_path, dest_path in to_copy:
+            copy_file(src_path, dest_path)
+    if output is not None:
+        for _, dest_path in to_copy:
+            output.record_copy(dest_path)
+    stats["copied"] = len(to_copy)
+    return stats
+
+def _remove_empty_dirs(root):
+    if not os.path.isdir(root):
+        return
+    for dir_path, _, _ in os.walk(root, topdown=False):
+        if dir_path != root and not os.listdir(dir_path):
+            os.rmdir(dir_path)
@@ -0,0 +1,295 @@
+import hashlib
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import block_cache
+import inline_cache
+import profiling
+from build_cache import hash_file
+from htmlnode import escape_text
+from link_index import page_url
+from enums import BlockType
+from markdown_blocks import (MMAP_THRESHOLD, Outline, block_to_block_type, blocks_to_html, heading_to_html_node,
+                             iter_file_blocks, iter_markdown_blocks, markdown_to_html)
+from templates import load_template, parse_template
+
+def page_title(outline):
+    #The title a render left in outline, the first h1's visible text
+    if outline.title is None:
+        raise ValueError("Markdown page has no h1 title")
+    return outline.title
+
+def extract_title(markdown):
+    #The title without rendering the page, only its headings are converted
+    outline = Outline()
+    for block in iter_markdown_blocks(markdown.split("\n")):
+        if block_to_block_type(block) == BlockType.HEADING:
+            heading_to_html_node(block, outline)
+            if outline.title is not None:
+                break
+    return page_title(outline)
+
+def fill_template(template, title, content, toc=""):
+    #title is plain text, content and toc are html
+    return template.render({"Title": escape_text(title), "Content": content, "TOC": toc})
+
+def fill_page(template, title, content, outline):
+    #template is a compiled Template, or template text which is parsed here
+    if isinstance(template, str):
+        template = parse_template(template)
+    toc = outline.to_html() if "TOC" in template.slots else ""
+    return fill_template(template, title, content, toc)
+
+def render_page(markdown, template, outline=None, links=None):
+    #outline and links are filled in while the blocks are rendered
+    if outline is None:
+        outline = Outline()
+    content = markdown_to_html(markdown, outline, links)
+    return fill_page(template, page_title(outline), content, outline)
+
+def render_blocks(blocks, outline=None, links=None, cache=None):
+    #The title and content html of a page given as its blocks
+    if outline is None:
+        outline = Outline()
+    content = blocks_to_html(blocks, outline, links, cache)
+    return page_title(outline), content
+
+def render_file(path, template, outline=None, links=None, source=None):
+    #Returns the page's html and title. source is the file's bytes when the
+    #caller already read them. Otherwise sources of MMAP_THRESHOLD or more
+    #are rendered block by block from iter_file_blocks instead of being read.
+    if outline is None:
+        outline = Outline()
+    if source is not None:
+        markdown = decode_markdown(source)
+    elif os.path.getsize(path) < MMAP_THRESHOLD:
+        markdown = read_markdown(path)
+    else:
+        title, content = render_blocks(iter_file_blocks(path), outline, links)
+        return fill_page(template, title, content, outline), title
+    html = render_page(markdown, template, outline, links)
+    return html, outline.title
+
+def write_page(dest_path, html):
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    with open(dest_path, "w", encoding="utf-8") as file:
+        file.write(html)
+
+def find_pages(content_dir, dest_dir):
+    #Pairs every markdown source with its html output path
+    pages = []
+    for entry in sorted(os.listdir(content_dir)):
+        from_path = os.path.join(content_dir, entry)
+        dest_path = os.path.join(dest_dir, entry)
+        if os.path.isdir(from_path):
+            pages.extend(find_pages(from_path, dest_path))
+        elif entry.endswith(".md"):
+            pages.append((from_path, dest_path[:-3] + ".html"))
+    return pages
+
+def shard_of(source, count):
+    #Stable across machines and Python runs, unlike hash()
+    digest = hashlib.blake2b(source.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+def in_shard(source, shard):
+    #source is relative to the content directory with "/" separators,
+    #shard is (number, count) with number counted from 1
+    number, count = shard
+    return shard_of(source, count) == number - 1
+
+def source_name(from_path, content_dir):
+    #The same on every OS, for shards and layouts
+    return os.path.relpath(from_path, content_dir).replace(os.sep, "/")
+
+def select_shard(pages, content_dir, shard):
+    if shard is None:
+        return pages
+    return [(from_path, dest_path) for from_path, dest_path in pages
+            if in_shard(source_name(from_path, content_dir), shard)]
+
+def parse_layout(text):
+    #"blog=layouts/post.html" renders the pages below content/blog with
+    #layouts/post.html
+    directory, separator, path = text.partition("=")
+    directory = posixpath.normpath(directory.replace(os.sep, "/")).strip("/")
+    if not separator or not path or directory in ("", "."):
+        raise ValueError(f"Layout must look like DIR=TEMPLATE: {text}")
+    return directory, path
+
+def layout_for(source, template_path, layouts):
+    #layouts maps content directories, relative with "/" separators, to
+    #their template. The deepest directory above source wins, pages outside
+    #every one of them use template_path.
+    if layouts:
+        directory = posixpath.dirname(source)
+        while directory:
+            layout = layouts.get(directory)
+            if layout is not None:
+                return layout
+            directory = posixpath.dirname(directory)
+    return template_path
+
+def load_layouts(template_path, layouts):
+    #Compiled template of the site and of every layout, by path
+    return {path: load_template(path) for path in {template_path, *(layouts or {}).values()}}
+
+#Small pages are sent to workers together so IPC does not dominate
+BATCH_BYTES = 256 * 1024
+
+def batch_markdown(markdowns, batch_bytes=BATCH_BYTES, size_of=len):
+    #size_of gives each item's size, os.path.getsize batches source paths
+    batches = []
+    batch = []
+    size = 0
+    for markdown in markdowns:
+        batch.append(markdown)
+        size += size_of(markdown)
+        if size >= batch_bytes:
+            batches.append(batch)
+            batch = []
+            size = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+def read_markdown(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+def decode_markdown(data):
+    #The text read_markdown gives for a file holding data
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+def render_source(path, template, index=False, source=None):
+    #With index, also returns the page's (title, heading ids, links) for a
+    #link index, collected from the nodes the page renders to
+    with profiling.page(path):
+        if not index:
+            return render_file(path, template, source=source)[0], None
+        outline = Outline()
+        links = []
+        html, title = render_file(path, template, outline, links, source)
+        return html, (title, sorted(outline.ids()), links)
+
+def render_batch(batch, index=False):
+    #(html, page index) of every (source path, template), the index is None
+    #unless asked for. A page can carry its source bytes as a third item.
+    return [render_source(path, template, index, *source) for path, template, *source in batch]
+
+def cache_counts():
+    #(block hits, block misses, inline hits, inline misses) of this process
+    blocks = block_cache.BLOCK_CACHE
+    inline = inline_cache.INLINE_CACHE
+    return ((blocks.hits, blocks.misses) if blocks is not None else (0, 0)) + \
+           ((inline.hits, inline.misses) if inline is not None else (0, 0))
+
+def render_batch_in_worker(batch, index=False):
+    #Also returns the blocks this worker rendered and the cache hits and
+    #misses of the batch, which the parent merges into its own caches.
+    #A template used by several pages of the batch is sent once.
+    before = cache_counts()
+    pages = render_batch(batch, index)
+    counts = tuple(after - start for after, start in zip(cache_counts(), before))
+    cache = block_cache.BLOCK_CACHE
+    return pages, cache.take_new() if cache is not None else [], counts
+
+def merge_worker_caches(new_blocks, counts):
+    blocks = block_cache.BLOCK_CACHE
+    if blocks is not None:
+        blocks.merge(new_blocks)
+        blocks.hits += counts[0]
+        blocks.misses += counts[1]
+    inline = inline_cache.INLINE_CACHE
+    if inline is not None:
+        inline.hits += counts[2]
+        inline.misses += counts[3]
+
+def worker_initargs():
+    #Workers get their own caches of the same size as this process and
+    #start from the same block cache file
+    inline = inline_cache.INLINE_CACHE
+    blocks = block_cache.BLOCK_CACHE
+    return (inline.maxsize if inline is not None else 0,
+            blocks.path if blocks is not None else None,
+            blocks.max_bytes if blocks is not None else 0)
+
+def init_worker(inline_cache_size, block_cache_path, block_cache_bytes):
+    if inline_cache_size:
+        inline_cache.enable_inline_cache(inline_cache_size)
+    if block_cache_bytes:
+        #The parent merges what each batch adds, see render_batch_in_worker
+        block_cache.enable_block_cache(block_cache_path, block_cache_bytes, track_new=True)
+
+def page_size(page):
+    return os.path.getsize(page[0])
+
+def render_pages(pages, jobs=1, batch_bytes=BATCH_BYTES, index=False):
+    #pages are (source path, template). Yields (html, page index) for them
+    #in the same order.
+    batches = batch_markdown(pages, batch_bytes, page_size) if jobs > 1 else []
+    workers = min(jobs, len(batches))
+    if workers < 2:
+        for path, template in pages:
+            yield render_source(path, template, index)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=worker_initargs()) as executor:
+        for rendered, new_blocks, counts in executor.map(render_batch_in_worker, batches, repeat(index)):
+            merge_worker_caches(new_blocks, counts)
+            yield from rendered
+
+def generate_pages_recursive(content_dir, template_path, dest_dir, cache=None, jobs=1, link_index=None,
+                             output=None, shard=None, layouts=None):
+    #With an OutputWriter, pages whose html did not change are not rewritten.
+    #A link index gets each page's links as the page is rendered. layouts
+    #picks other templates for content directories, see layout_for.
+    write = write_page if output is None else output.write
+    index = link_index is not None
+    written = 0
+    pending = [] #Pages that have to be rendered
+
+    for from_path, dest_path in select_shard(find_pages(content_dir, dest_dir), content_dir, shard):
+        layout = layout_for(source_name(from_path, content_dir), template_path, layouts)
+        source_hash = None
+        if cache is not None:
+            source_hash = hash_file(from_path)
+            html = cache.lookup(from_path, source_hash, need_index=index, template=layout)
+            if html is not None:
+                if index:
+                    link_index.add_rendered_page(page_url(dest_path, dest_dir), *cache.page_index(from_path))
+                if output is not None:
+                    output.write(dest_path, html) #Keeps the page in the output manifest
+                elif not os.path.exists(dest_path):
+                    write_page(dest_path, html)
+                    written += 1
+                continue
+
+        pending.append((from_path, dest_path, source_hash, layout)) #Sources are read by the renderer
+
+    if not pending:
+        return written
+
+    #Parsed once, workers get the compiled chunks
+    templates = load_layouts(template_path, layouts)
+
+    if profiling.PROFILER is not None:
+        jobs = 1 #Profiled pages are rendered one at a time in this process
+
+    #Each page is written as it is rendered instead of after the whole build
+    pages = [(from_path, templates[layout]) for from_path, _, _, layout in pending]
+    rendered = render_pages(pages, jobs, index=index)
+    for (from_path, dest_path, source_hash, layout), (html, page_index) in zip(pending, rendered):
+        write(dest_path, html)
+        if index:
+            link_index.add_rendered_page(page_url(dest_path, dest_dir), *page_index)
+        if cache is not None:
+            cache.store(from_path, source_hash, list(templates[layout].deps), html, page_index, layout)
+        written += 1
+
+    return written
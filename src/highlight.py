@@ -0,0 +1,119 @@
+import hashlib
+import re
+from collections import OrderedDict
+
+from htmlnode import LeafNode, freeze_node, freeze_props
+from profiling import instrument, count_items
+
+#Each lexer is one regex of named groups, the group name is the token type.
+#Text between matches is plain and is emitted without a span.
+_STRING = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+
+LEXERS = {
+    "python": re.compile(r"""
+        (?P<comment>\#[^\n]*)
+        |(?P<string>(?<!\w)[rRbBuUfF]{0,2}(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|""" + _STRING + r"""))
+        |(?P<decorator>@[\w.]+)
+        |(?P<function>(?<=\bdef\ )\w+|(?<=\bclass\ )\w+)
+        |(?P<keyword>\b(?:False|None|True|and|as|assert|async|await|break|class|continue|def|del
+            |elif|else|except|finally|for|from|global|if|import|in|is|lambda|match|case
+            |nonlocal|not|or|pass|raise|return|try|while|with|yield)\b)
+        |(?P<builtin>\b(?:print|len|range|str|int|float|list|dict|set|tuple|bool|open
+            |isinstance|super|self|enumerate|zip|sorted)\b)
+        |(?P<number>\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?j?)\b)
+        """, re.VERBOSE),
+    "bash": re.compile(r"""
+        (?P<comment>(?<!\S)\#[^\n]*)
+        |(?P<string>""" + _STRING + r""")
+        |(?P<variable>\$(?:\{[^}\n]*\}|\w+|[@#?$!*-]))
+        |(?P<keyword>\b(?:if|then|else|elif|fi|for|while|until|do|done|case|esac|in
+            |function|return|local|export|select)\b)
+        |(?P<builtin>\b(?:echo|cd|exit|set|source|read|printf|test|shift|unset)\b)
+        |(?P<number>\b\d+\b)
+        """, re.VERBOSE),
+    "json": re.compile(r"""
+        (?P<property>"(?:\\.|[^"\\\n])*"(?=\s*:))
+        |(?P<string>"(?:\\.|[^"\\\n])*")
+        |(?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)
+        |(?P<keyword>\b(?:true|false|null)\b)
+        """, re.VERBOSE),
+    "yaml": re.compile(r"""
+        (?P<comment>(?<!\S)\#[^\n]*)
+        |(?P<keyword>^(?:---|\.\.\.)$|\b(?:true|false|null|yes|no|on|off)\b(?![\w.-]))
+        |(?P<property>[\w.-]+(?=:(?:\s|$)))
+        |(?P<string>""" + _STRING + r""")
+        |(?P<number>(?<![\w.-])-?\d+(?:\.\d+)?(?![\w.-]))
+        |(?P<variable>[&*][\w-]+)
+        """, re.VERBOSE | re.MULTILINE),
+}
+
+ALIASES = {"py": "python", "sh": "bash", "shell": "bash", "yml": "yaml"}
+
+#One props mapping per token type, so its attribute string is serialized once
+_TOKEN_PROPS = {}
+for _lexer in LEXERS.values():
+    for _token in _lexer.groupindex:
+        _TOKEN_PROPS[_token] = freeze_props({"class": f"tok-{_token}"})
+
+def language_name(info):
+    #The first word of the fence's info string names the language
+    words = info.split()
+    if not words:
+        return None
+    language = words[0].lower()
+    return ALIASES.get(language, language)
+
+@instrument("highlight", nodes=count_items)
+def tokens_to_nodes(code, lexer):
+    nodes = []
+    position = 0
+    for match in lexer.finditer(code):
+        start, end = match.span()
+        if start == end:
+            continue
+        if start > position:
+            nodes.append(LeafNode(None, code[position:start]))
+        nodes.append(LeafNode("span", match.group(), _TOKEN_PROPS[match.lastgroup]))
+        position = end
+    if position < len(code):
+        nodes.append(LeafNode(None, code[position:]))
+    return nodes
+
+class HighlightCache():
+    #Snippets repeat across pages (install commands, config examples),
+    #so highlighted nodes are kept by language and a hash of the code
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def nodes(self, code, language):
+        key = (language, hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest())
+        nodes = self._entries.get(key)
+        if nodes is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return nodes
+
+        self.misses += 1
+        nodes = tuple(freeze_node(node) for node in tokens_to_nodes(code, LEXERS[language]))
+        self._entries[key] = nodes
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return nodes
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+HIGHLIGHT_CACHE = HighlightCache()
+
+def highlight(code, language):
+    #Returns the code as a list of html nodes, or None for unknown languages.
+    #The nodes are shared with the cache and every page that highlights the
+    #same code, so they are frozen
+    if language not in LEXERS:
+        return None
+    return list(HIGHLIGHT_CACHE.nodes(code, language))
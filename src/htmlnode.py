@@ -1,4 +1,35 @@
+from html import escape
+from types import MappingProxyType
+
+from profiling import instrument
+
+def serialize_props(props):
+    #Values are escaped only when they contain something to escape
+    html = ""
+    for key, value in props.items():
+        value = str(value)
+        if "&" in value or '"' in value or "<" in value or ">" in value:
+            value = escape(value)
+        html += f' {key}="{value}"'
+    return html
+
+def escape_text(value):
+    #Text content escaping, as leaves do it, for html assembled outside nodes
+    value = str(value)
+    if "&" in value or "<" in value or ">" in value:
+        return escape(value, quote=False)
+    return value
+
+def freeze_props(props):
+    #Read-only props are serialized once and reused by every node sharing them
+    return MappingProxyType(dict(props))
+
+_frozen_props_html = {} #id(props) -> (props, html)
+
 class HTMLNode():
+    #Pages create a lot of nodes, so they carry no per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -8,22 +39,54 @@ class HTMLNode():
     def __eq__(self, other):
         if not isinstance(other, HTMLNode):
             return False
+        #Frozen nodes keep their children in a tuple
+        children = self.children
+        other_children = other.children
+        if type(children) is not type(other_children) and children is not None and other_children is not None:
+            children = list(children)
+            other_children = list(other_children)
         return (self.tag == other.tag and
                 self.value == other.value and
-                self.children == other.children and
+                children == other_children and
                 self.props == other.props)
 
+    @instrument("to_html", size=len)
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        #Walk the tree with an explicit stack so deep trees cannot hit the
+        #recursion limit. Strings on the stack are closing tags still owed.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            else:
+                yield node.open_html(stack)
+
+    def write_html(self, fp):
+        fp.writelines(self.iter_html())
+
+    def open_html(self, stack):
+        #Returns the html that starts this node and pushes whatever follows it
         raise NotImplementedError("to_html method not implemented")
     
     def props_to_html(self):
-        if not self.props: # Covers both `None` and empty `{}` 
+        props = self.props
+        if not props: # Covers both `None` and empty `{}` 
             return ""
-        
-        formatted_props = map(
-            lambda item: f'{item[0]}="{item[1]}"', self.props.items()
-        )
-        return " " + " ".join(formatted_props)
+        if type(props) is not MappingProxyType:
+            return serialize_props(props)
+
+        cached = _frozen_props_html.get(id(props))
+        if cached is not None and cached[0] is props:
+            return cached[1]
+        if len(_frozen_props_html) >= 4096:
+            _frozen_props_html.clear()
+        html = serialize_props(props)
+        _frozen_props_html[id(props)] = (props, html)
+        return html
     
     def __repr__(self):
 
@@ -31,24 +94,37 @@ class HTMLNode():
             f'children={self.children}, props={self.props})')
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
-        if self.value == None:
+    def open_html(self, stack):
+        #Text and attributes are escaped here, once per leaf. The checks are
+        #inlined because most leaves are plain text with nothing to escape.
+        value = self.value
+        if value is None:
             raise ValueError("LeafNode must have a value")
-        if self.tag == None:
-            return self.value
-        props_str = self.props_to_html()
-        return f'<{self.tag}{props_str}>{self.value}</{self.tag}>'
+        if type(value) is not str:
+            value = str(value)
+        if "&" in value or "<" in value or ">" in value:
+            value = escape(value, quote=False)
+        tag = self.tag
+        if tag is None:
+            return value
+        if not self.props:
+            return f'<{tag}>{value}</{tag}>'
+        return f'<{tag}{self.props_to_html()}>{value}</{tag}>'
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def open_html(self, stack):
         if self.tag == None:
             raise ValueError("ParentNode must have a tag")
         if self.children == None:
@@ -57,11 +133,54 @@ class ParentNode(HTMLNode):
         #Convert props to html format
         props_str = self.props_to_html()
 
-        #Map to_html to each child in parent's children
-        #join result to single string without seperator
-        children_html = "".join(map(lambda child: child.to_html(), self.children))
+        #Closing tag comes out after every child, which are popped in order
+        stack.append(f'</{self.tag}>')
+        stack.extend(reversed(self.children))
         
-        return f'<{self.tag}{props_str}>{children_html}</{self.tag}>'
+        return f'<{self.tag}{props_str}>'
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
+
+class _Frozen():
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+class FrozenLeafNode(_Frozen, LeafNode):
+    __slots__ = ()
+
+class FrozenParentNode(_Frozen, ParentNode):
+    __slots__ = ()
+
+def _frozen_copy(cls, node, children):
+    frozen = object.__new__(cls)
+    props = node.props
+    if props and type(props) is not MappingProxyType:
+        props = freeze_props(props)
+    for name, value in (("tag", node.tag), ("value", node.value), ("children", children), ("props", props)):
+        object.__setattr__(frozen, name, value)
+    return frozen
+
+def freeze_node(node):
+    #A read-only copy of node and everything below it, for nodes that are
+    #shared between pages. Built without recursion, like iter_html.
+    frozen = {} #id(node) -> its frozen copy
+    stack = [(node, False)]
+    while stack:
+        current, children_done = stack.pop()
+        if isinstance(current, _Frozen):
+            frozen[id(current)] = current
+        elif current.children is None:
+            frozen[id(current)] = _frozen_copy(FrozenLeafNode, current, None)
+        elif children_done:
+            children = tuple(frozen[id(child)] for child in current.children)
+            frozen[id(current)] = _frozen_copy(FrozenParentNode, current, children)
+        else:
+            stack.append((current, True))
+            stack.extend((child, False) for child in current.children)
+    return frozen[id(node)]
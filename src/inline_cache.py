@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+from htmlnode import freeze_node
+from inline_parser import parse_inline
+
+class InlineCache():
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() #text -> [html nodes, rendered html]
+
+    def _entry(self, text):
+        entry = self._entries.get(text)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(text)
+            return entry
+
+        self.misses += 1
+        #Every page that hits the entry gets these nodes, so they are frozen
+        nodes = tuple(freeze_node(node) for node in parse_inline(text))
+        entry = [nodes, None]
+        self._entries[text] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False) #Evict the least recently used
+        return entry
+
+    def html_nodes(self, text):
+        #The nodes are shared between every caller and cannot be changed
+        return self._entry(text)[0]
+
+    def render(self, text):
+        entry = self._entry(text)
+        if entry[1] is None:
+            entry[1] = "".join(node.to_html() for node in entry[0])
+        return entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+#Used by markdown_to_html_node when set, off unless a build opts in
+INLINE_CACHE = None
+
+def enable_inline_cache(maxsize=4096):
+    global INLINE_CACHE
+    INLINE_CACHE = InlineCache(maxsize)
+    return INLINE_CACHE
+
+def disable_inline_cache():
+    global INLINE_CACHE
+    cache = INLINE_CACHE
+    INLINE_CACHE = None
+    return cache
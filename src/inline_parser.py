@@ -0,0 +1,186 @@
+import re
+
+from enums import TextType
+from htmlnode import LeafNode, ParentNode
+from profiling import instrument, count_items
+
+#Inline markdown to html nodes in one left-to-right pass. Emphasis is matched
+#with a delimiter stack and links with a bracket stack, so markup can nest
+#(bold inside a link, italic inside bold) and nothing is scanned twice.
+#Delimiters that never match are kept as text instead of raising, and the
+#work stays linear however the input is built.
+
+_TOKEN_RE = re.compile(r"\*\*|[_`\]]|!?\[")
+#A destination cannot hold parentheses, so each scan stops at the next one
+#and no two scans cover the same text
+_DESTINATION_RE = re.compile(r"\(([^()]*)\)")
+
+_EMPHASIS_TAGS = {"**": "b", "_": "i"}
+
+_CLOSE = object() #Ends the element opened by the last ("open", tag, props) item
+
+def _flanking(source, start, end):
+    #Whether the delimiter at source[start:end] can open and can close
+    before = source[start - 1] if start > 0 else " "
+    after = source[end] if end < len(source) else " "
+    can_open = not after.isspace()
+    can_close = not before.isspace()
+    if end - start == 1: #_ does not start or end emphasis inside a word
+        can_open = can_open and not before.isalnum()
+        can_close = can_close and not after.isalnum()
+    return can_open, can_close
+
+def _match_emphasis(items, delimiters, bottom):
+    #Pairs each closer with the nearest opener of its kind. Openers of other
+    #kinds left between the two can no longer match and are dropped, so every
+    #delimiter is pushed and popped at most once.
+    openers = {"**": [], "_": []}
+    for index, kind, can_open, can_close in delimiters[bottom:]:
+        stack = openers[kind]
+        if can_close and stack:
+            opener = stack.pop()
+            for other in openers.values():
+                while other and other[-1] > opener:
+                    other.pop()
+            items[opener] = ("open", _EMPHASIS_TAGS[kind], None)
+            items[index] = _CLOSE
+        elif can_open:
+            stack.append(index)
+    del delimiters[bottom:]
+
+def _build_tree(items):
+    root = []
+    children = root
+    parents = [] #(tag, props, children of the parent) for each open element
+    text = []
+    for item in items:
+        if isinstance(item, str):
+            text.append(item)
+            continue
+        if text:
+            children.append(LeafNode(None, "".join(text)))
+            text = []
+
+        if item is _CLOSE:
+            tag, props, parent = parents.pop()
+            if len(children) == 1 and children[0].tag is None:
+                parent.append(LeafNode(tag, children[0].value, props))
+            elif children:
+                parent.append(ParentNode(tag, children, props))
+            elif tag == "a":
+                parent.append(LeafNode(tag, "", props))
+            children = parent
+        elif isinstance(item, tuple):
+            parents.append((item[1], item[2], children))
+            children = []
+        else:
+            children.append(item) #A finished code span or image
+
+    if text:
+        children.append(LeafNode(None, "".join(text)))
+    return root
+
+@instrument("parse_inline", nodes=count_items)
+def parse_inline(source):
+    token = _TOKEN_RE.search(source)
+    if token is None: #Most text has no markup at all
+        return [LeafNode(None, source)] if source else []
+
+    items = [] #Text, finished leaves and open/close markers in source order
+    delimiters = [] #(item index, kind, can open, can close) not yet matched
+    brackets = [] #(item index, delimiter count, source start, is image)
+    link_floor = 0 #Brackets below this are inside a link and cannot start one
+    image_floor = 0 #Image brackets below this are around an image and cannot start one
+
+    text_start = 0
+    pos = 0
+    while token is not None:
+        start, end = token.span()
+        delimiter = token.group()
+        if start > text_start:
+            items.append(source[text_start:start])
+        pos = text_start = end
+
+        if delimiter == "`":
+            close = source.find("`", end)
+            if close == -1: #No backtick follows, so none later can match either
+                items.append(delimiter)
+            else:
+                if close > end:
+                    items.append(LeafNode("code", source[end:close]))
+                pos = text_start = close + 1
+
+        elif delimiter in _EMPHASIS_TAGS:
+            can_open, can_close = _flanking(source, start, end)
+            if can_open or can_close:
+                delimiters.append((len(items), delimiter, can_open, can_close))
+            items.append(delimiter)
+
+        elif delimiter != "]": #[ or ![
+            brackets.append((len(items), len(delimiters), start, delimiter == "!["))
+            items.append(delimiter)
+
+        elif not brackets:
+            items.append(delimiter)
+
+        else:
+            index, bottom, bracket_start, is_image = brackets.pop()
+            active = len(brackets) >= link_floor and (not is_image or len(brackets) >= image_floor)
+            link_floor = min(link_floor, len(brackets))
+            image_floor = min(image_floor, len(brackets))
+            destination = _DESTINATION_RE.match(source, end) if active else None
+            if destination is None: #Not a link, both brackets stay text
+                items.append(delimiter)
+            else:
+                url = destination.group(1)
+                if is_image:
+                    #Alt text is plain, so markup inside it is left unparsed
+                    alt = source[bracket_start + 2:start]
+                    del items[index:]
+                    del delimiters[bottom:]
+                    items.append(LeafNode("img", "", {"src": url, "alt": alt}))
+                    #Images cannot contain images, so no alt text is sliced twice
+                    image_floor = len(brackets)
+                else:
+                    _match_emphasis(items, delimiters, bottom)
+                    items[index] = ("open", "a", {"href": url})
+                    items.append(_CLOSE)
+                    link_floor = len(brackets) #Links cannot contain links
+                pos = text_start = destination.end()
+
+        token = _TOKEN_RE.search(source, pos)
+
+    if text_start < len(source):
+        items.append(source[text_start:])
+    if delimiters:
+        _match_emphasis(items, delimiters, 0)
+    return _build_tree(items)
+
+def inline_text(nodes):
+    #The text a reader sees, image alt text included
+    parts = []
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if node.children is not None:
+            stack.extend(reversed(node.children))
+        elif node.tag == "img":
+            parts.append(node.props["alt"])
+        else:
+            parts.append(node.value)
+    return "".join(parts)
+
+def inline_links(nodes):
+    #(target, text, TextType) of every link and image, in document order.
+    #An image inside a link gives both.
+    links = []
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if node.tag == "a":
+            links.append((node.props["href"], inline_text([node]), TextType.LINK))
+        elif node.tag == "img":
+            links.append((node.props["src"], node.props["alt"], TextType.IMAGE))
+        if node.children is not None:
+            stack.extend(reversed(node.children))
+    return links
@@ -0,0 +1,84 @@
+import os
+from urllib.parse import unquote, urljoin, urlsplit
+
+from markdown_blocks import Outline, iter_block_nodes
+
+def page_url(dest_path, dest_dir):
+    #Site-absolute url of an output file, e.g. public/blog/post.html -> /blog/post.html
+    rel_path = os.path.relpath(dest_path, dest_dir)
+    return "/" + rel_path.replace(os.sep, "/")
+
+def scan_page(markdown):
+    #Returns the page's links as (target, text, TextType) and its heading ids.
+    #Builds index them while rendering, this is for a page on its own.
+    links = []
+    outline = Outline() #Gives repeated headings the same ids as the page
+    for _ in iter_block_nodes(markdown, outline, links):
+        pass
+    return links, outline.ids()
+
+class LinkIndex():
+    def __init__(self):
+        self.links = [] #(source url, target, text, TextType)
+        self.targets = {} #url -> set of anchor ids, or None for static files
+
+    def add_page(self, url, anchors=()):
+        self.targets[url] = set(anchors)
+
+    def add_file(self, url):
+        self.targets[url] = None
+
+    def add_links(self, source_url, links):
+        for target, text, text_type in links:
+            self.links.append((source_url, target, text, text_type))
+
+    def add_rendered_page(self, source_url, title, anchors, links):
+        #The page index gencontent.render_source collected
+        self.add_page(source_url, anchors)
+        self.add_links(source_url, links)
+
+    def index_page(self, source_url, markdown):
+        links, anchors = scan_page(markdown)
+        self.add_page(source_url, anchors)
+        self.add_links(source_url, links)
+
+    def resolve(self, source_url, target):
+        #Returns (url, fragment) for internal links, None for external ones
+        parts = urlsplit(target)
+        if parts.scheme or parts.netloc:
+            return None
+        path = unquote(parts.path)
+        url = urljoin(source_url, path) if path else source_url
+        return url, unquote(parts.fragment)
+
+    def find_target(self, url):
+        #Pretty urls like /blog/post and /blog/ point at .html and index.html
+        for candidate in (url, url + ".html", url.rstrip("/") + "/index.html"):
+            if candidate in self.targets:
+                return candidate
+        return None
+
+    def broken_links(self):
+        broken = []
+        for source_url, target, text, text_type in self.links:
+            resolved = self.resolve(source_url, target)
+            if resolved is None:
+                continue
+            url, fragment = resolved
+            found = self.find_target(url)
+            if found is None:
+                broken.append((source_url, target, text, text_type, "missing page"))
+                continue
+            anchors = self.targets[found]
+            if fragment and anchors is not None and fragment not in anchors:
+                broken.append((source_url, target, text, text_type, "missing anchor"))
+        return broken
+
+    def report(self):
+        broken = self.broken_links()
+        if not broken:
+            return f"Checked {len(self.links)} links, none broken"
+        lines = [f"Checked {len(self.links)} links, {len(broken)} broken:"]
+        for source_url, target, text, text_type, reason in broken:
+            lines.append(f"  {source_url}: {text_type.value} '{text}' -> {target} ({reason})")
+        return "\n".join(lines)
@@ -1,10 +1,189 @@
-from textnode import *
-from enums import TextType
+import argparse
+import os
+import sys
 
+import block_cache
+import inline_cache
+import profiling
+from async_build import generate_pages_async
+from build_cache import BuildCache
+from copystatic import COMPARE_MODES, list_files, sync_static
+from gencontent import find_pages, generate_pages_recursive, in_shard, parse_layout
+from link_index import LinkIndex
+from output_writer import OutputWriter
+from server import serve
+from shards import ShardManifest, merge_manifests, parse_shard, write_page_index, write_sitemap
 
-def main():
-    test = TextNode("test", TextType.BOLD)
-    print (test.__repr__())
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build a static site from markdown")
+    commands = parser.add_subparsers(dest="command")
+
+    #Site layout options shared by every command
+    site = argparse.ArgumentParser(add_help=False)
+    site.add_argument("--content", default="./content", help="markdown source directory")
+    site.add_argument("--template", default="./template.html", help="page template")
+    site.add_argument("--layout", type=parse_layout, action="append", default=[], metavar="DIR=TEMPLATE",
+                      help="template for the pages below content directory DIR, the deepest DIR wins")
+    site.add_argument("--dest", default="./public", help="output directory")
+    site.add_argument("--static", default="./static", help="static asset directory")
+
+    build = commands.add_parser("build", parents=[site], help="generate html pages from markdown")
+    build.add_argument("--asset-compare", choices=COMPARE_MODES, default="mtime",
+                       help="how to tell that a static file changed")
+    build.add_argument("--copy-threads", type=int, default=8, help="threads for copying static files")
+    build.add_argument("--cache", help="incremental build cache file, default ./.build_cache.json "
+                                       "or ./.build_cache.I-of-N.json for a shard")
+    build.add_argument("--no-cache", action="store_true", help="rebuild every page")
+    build.add_argument("--output-manifest", metavar="FILE",
+                       help="hashes of the last build's pages, unchanged pages are not rewritten, "
+                            "default ./.output_manifest.json or ./.output_manifest.I-of-N.json for a shard")
+    build.add_argument("--changed-manifest", metavar="FILE",
+                       help="write the pages that changed or were removed in this build as JSON")
+    build.add_argument("--jobs", "-j", type=int, default=1,
+                       help="worker processes for rendering, 0 uses every core")
+    build.add_argument("--async-io", action="store_true",
+                       help="overlap file reads and writes with rendering, for slow filesystems")
+    build.add_argument("--io-threads", type=int, default=8, help="concurrent reads and writes with --async-io")
+    build.add_argument("--inline-cache", type=int, default=0, metavar="SIZE",
+                       help="cache up to SIZE rendered inline strings, 0 turns it off")
+    build.add_argument("--block-cache", metavar="FILE",
+                       help="reuse rendered blocks across builds through this cache file")
+    build.add_argument("--block-cache-size", type=int, default=64, metavar="MB",
+                       help="most html the block cache keeps, least recently used goes first")
+    build.add_argument("--check-links", action="store_true",
+                       help="report links and images that point at missing pages, files or headings")
+    build.add_argument("--shard", type=parse_shard, metavar="I/N",
+                       help="build only the pages of shard I out of N, for splitting a site across machines")
+    build.add_argument("--shard-manifest", metavar="FILE",
+                       help="where a shard writes its pages, headings and links, default ./.shard_I_of_N.json")
+    build.add_argument("--profile", action="store_true",
+                       help="print the slowest pages and stages after the build")
+    build.add_argument("--trace", metavar="FILE",
+                       help="write a Chrome trace-event JSON file (implies --profile)")
+
+    merge = commands.add_parser("merge", help="combine the manifests of a sharded build")
+    merge.add_argument("manifests", nargs="+", metavar="MANIFEST", help="one manifest from every shard")
+    merge.add_argument("--dest", default="./public", help="where sitemap.xml and pages.json are written")
+    merge.add_argument("--base-url", default="", help="site url put in front of every sitemap entry")
+    merge.add_argument("--check-links", action="store_true",
+                       help="report links that point at missing pages, files or headings on any shard")
+
+    preview = commands.add_parser("serve", parents=[site], help="build and serve a local preview")
+    preview.add_argument("--port", type=int, default=8888)
+    preview.add_argument("--watch", action="store_true",
+                         help="rebuild changed pages and reload the browser on save")
+
+    #Running with no arguments does a default build
+    return parser.parse_args(argv or ["build"])
+
+def shard_path(path, shard):
+    #Shards get their own state files, so shards built from one directory
+    #do not overwrite each other's cache and manifest
+    if shard is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{shard[0]}-of-{shard[1]}{ext}"
+
+def build(args):
+    cache = None if args.no_cache else BuildCache(args.cache or shard_path("./.build_cache.json", args.shard))
+    owns = None
+    if args.shard is not None:
+        #Output paths map back to their sources the way find_pages maps them
+        owns = lambda rel_path: in_shard(rel_path[:-len(".html")] + ".md", args.shard)
+    output = OutputWriter(args.dest, args.output_manifest or shard_path("./.output_manifest.json", args.shard), owns)
+    profiler = None
+    jobs = args.jobs or os.cpu_count() or 1
+    if args.profile or args.trace:
+        profiler = profiling.enable(trace=bool(args.trace))
+        if jobs > 1:
+            print(f"Profiling renders every page in this process, ignoring --jobs {jobs}", file=sys.stderr)
+            jobs = 1
+    if args.inline_cache > 0:
+        inline_cache.enable_inline_cache(args.inline_cache)
+    if args.block_cache:
+        block_cache.enable_block_cache(args.block_cache, args.block_cache_size * 1024 * 1024)
+
+    #Static files are the same on every shard, so only the first copies them
+    if os.path.isdir(args.static) and (args.shard is None or args.shard[0] == 1):
+        #Generated pages are not static files, but they are not stale either
+        pages = {os.path.relpath(dest_path, args.dest)
+                 for _, dest_path in find_pages(args.content, args.dest)}
+        synced = sync_static(args.static, args.dest, args.asset_compare, args.copy_threads, keep=pages,
+                             output=output)
+        print(f"Static files: {synced['copied']} copied, {synced['unchanged']} unchanged, "
+              f"{synced['removed']} removed")
+
+    link_index = None
+    if args.shard is not None:
+        #Links are checked once every shard is merged
+        link_index = ShardManifest(args.shard)
+    elif args.check_links:
+        link_index = LinkIndex()
+    if link_index is not None:
+        if os.path.isdir(args.static):
+            for rel_path in list_files(args.static):
+                link_index.add_file("/" + rel_path.replace(os.sep, "/"))
+
+    if args.async_io:
+        written = generate_pages_async(args.content, args.template, args.dest, cache, jobs,
+                                       args.io_threads, link_index, output, args.shard, layouts=dict(args.layout))
+    else:
+        written = generate_pages_recursive(args.content, args.template, args.dest, cache, jobs,
+                                           link_index, output, args.shard, dict(args.layout))
+    if cache is not None:
+        cache.save()
+        print(f"Generated {written} pages ({cache.hits} unchanged)")
+    else:
+        print(f"Generated {written} pages")
+    output.delete_removed()
+    output.save(args.changed_manifest)
+    print(f"Output: {len(output.changed)} written, {output.unchanged} unchanged, "
+          f"{len(output.removed())} removed")
+
+    if args.shard is not None:
+        number, count = args.shard
+        manifest_path = args.shard_manifest or f"./.shard_{number}_of_{count}.json"
+        link_index.save(manifest_path)
+        print(f"Shard {number}/{count}: {len(link_index.pages())} pages, manifest in {manifest_path}")
+    elif link_index is not None:
+        print(link_index.report())
+
+    used_block_cache = block_cache.disable_block_cache()
+    if used_block_cache is not None:
+        used_block_cache.save()
+        print(f"Block cache: {used_block_cache.hits} hits, {used_block_cache.misses} misses")
+
+    used_inline_cache = inline_cache.disable_inline_cache()
+    if used_inline_cache is not None:
+        stats = used_inline_cache.stats()
+        print(f"Inline cache: {stats['hits']} hits, {stats['misses']} misses")
+
+    if profiler is not None:
+        profiling.disable()
+        print(profiler.report())
+        if args.trace:
+            profiler.write_trace(args.trace)
+
+def merge(args):
+    manifest = merge_manifests(args.manifests)
+    os.makedirs(args.dest, exist_ok=True)
+    write_sitemap(manifest, os.path.join(args.dest, "sitemap.xml"), args.base_url)
+    write_page_index(manifest, os.path.join(args.dest, "pages.json"))
+    print(f"Merged {len(args.manifests)} shards, {len(manifest.pages())} pages")
+    if args.check_links:
+        print(manifest.report())
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command in ("build", "serve") and not os.path.isdir(args.content):
+        print(f"Content directory {args.content} not found, pass --content to use another", file=sys.stderr)
+        return 1
+    if args.command == "build":
+        build(args)
+    elif args.command == "merge":
+        merge(args)
+    elif args.command == "serve":
+        serve(args.content, args.template, args.dest, args.static, args.port, args.watch, dict(args.layout))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -1,51 +1,318 @@
-from enums import BlockType
+import mmap
+import os
+
+import block_cache
+import inline_cache
+from enums import BlockType, TextType
+from profiling import instrument, instrument_iter
+from highlight import highlight, language_name
+from htmlnode import LeafNode, ParentNode
+from inline_parser import inline_links, inline_text, parse_inline
+from textnode import TextNode, text_node_to_html_node
 import re
 
 def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
+    return list(iter_markdown_blocks(markdown.split("\n")))
 
-    #Create  a new list of non-empty blocks
-    clean_blocks = []
+#Every way of splitting a page ends in one of these two, so the build's
+#splitting is profiled whichever path it takes
+@instrument_iter("markdown_to_blocks")
+def iter_markdown_blocks(lines):
+    #Lines can come from an open file (with "\n" endings) or any iterator
+    block_lines = []
 
-    #Iterate through blocks
-    for block in blocks:
-        #Split block into lines, strip each line, then join
-        lines = block.split("\n")
-        stripped_lines = [line.strip() for line in lines]
-        clean_block = "\n".join(stripped_lines).strip()
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+
+        if line == "": #Blank line ends the current block
+            clean_block = "\n".join(block_lines).strip()
+            block_lines = []
+            if clean_block != "": #Only yield non-empty blocks
+                yield clean_block
+            continue
+
+        block_lines.append(line.strip())
+
+    #Yield the last block if the input did not end with a blank line
+    clean_block = "\n".join(block_lines).strip()
+    if clean_block != "":
+        yield clean_block
+
+#Files at least this big are split over a memory map instead of being read
+MMAP_THRESHOLD = 32 * 1024 * 1024
+
+def iter_file_blocks(path):
+    if os.path.getsize(path) >= MMAP_THRESHOLD:
+        yield from iter_mapped_blocks(path)
+        return
+    with open(path, encoding="utf-8") as file:
+        yield from iter_markdown_blocks(file)
+
+#A newline followed by one or more empty lines ends a block. Starting on a
+#literal "\n" lets re skip ahead quickly; a CRLF's "\r" is stripped later.
+_BLANK_LINES_RE = re.compile(rb"\n(?:\r?\n)+")
+
+@instrument_iter("markdown_to_blocks")
+def iter_mapped_blocks(path):
+    #Block boundaries are found in the mapped bytes, so only one block at a
+    #time is copied out of the page cache and decoded
+    if os.path.getsize(path) == 0:
+        return #Empty files cannot be mapped
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        for match in _BLANK_LINES_RE.finditer(data):
+            block = _strip_block_lines(data[start:match.start()].decode("utf-8"))
+            if block != "":
+                yield block
+            start = match.end()
+        block = _strip_block_lines(data[start:].decode("utf-8"))
+        if block != "":
+            yield block
+
+def _strip_block_lines(text):
+    #Same lines as iter_markdown_blocks keeps, "\r" of CRLF files included
+    return "\n".join(line.strip() for line in text.split("\n")).strip()
 
-        if clean_block != "": #Only add non-empty blocks
-            clean_blocks.append(clean_block)
-    
-    return clean_blocks
+_HEADING_RE = re.compile(r"#{1,6}\s")
+_ORDERED_ITEM_RE = re.compile(r"(\d+)\.\s")
 
+@instrument("block_to_block_type")
 def block_to_block_type(block):
-    if re.match(r"(^#{1,6})\s", block): #Matches Heading Block
-        return BlockType.HEADING
-    
-    if block.startswith("```") and block.endswith("```"): #Matches Code Block
-        return BlockType.CODE
-    
-    #Prepare to check line based blocks
-    lines = block.split("\n")
-    
-    if all(line.startswith(">") for line in lines): #Matches Quote blocks
-        return BlockType.QUOTE
-    
-    if all(line.startswith("- ") for line in lines): #Matches Unordered List blocks
-        return BlockType.UNORDERED_LIST
-    
-    #Matches ordered list blocks
-    expected_number = 1
-    for line in lines:
-        match = re.match(r"^(\d+)\.\s", line)
-        if match:
-            number = int(match.group(1))
-            if number != expected_number: #Checks to see if incremented correctly
+    #The first character rules out every type but one, so only that
+    #type is checked. Anything that fails its check is a paragraph.
+    first = block[:1]
+
+    if first == "#": #Heading Block
+        if _HEADING_RE.match(block):
+            return BlockType.HEADING
+
+    elif first == "`": #Code Block
+        if block.startswith("```") and block.endswith("```"):
+            return BlockType.CODE
+
+    elif first == ">": #Quote Block, every line starts with ">"
+        if block.count("\n") == block.count("\n>"):
+            return BlockType.QUOTE
+
+    elif first == "-": #Unordered List, every line starts with "- "
+        if block.startswith("- ") and block.count("\n") == block.count("\n- "):
+            return BlockType.UNORDERED_LIST
+
+    elif first.isdigit(): #Ordered List, numbered 1, 2, 3...
+        expected_number = 1
+        for line in block.split("\n"):
+            match = _ORDERED_ITEM_RE.match(line)
+            if not match or int(match.group(1)) != expected_number:
                 break
             expected_number += 1
         else:
-            break
+            return BlockType.ORDERED_LIST
+
+    return BlockType.PARAGRAPH
+
+@instrument("markdown_to_html_node")
+def markdown_to_html_node(markdown, outline=None, links=None):
+    #Headings are added to outline and links to the links list as the
+    #blocks are converted
+    if outline is None:
+        outline = Outline()
+    children = []
+    for block in markdown_to_blocks(markdown):
+        children.append(block_to_html_node(block, block_to_block_type(block), outline, links))
+    return ParentNode("div", children)
+
+def iter_block_nodes(markdown, outline=None, links=None):
+    #Yields the html node of one top-level block at a time, built as the
+    #markdown is split, so only the current block's tree has to be in memory
+    if outline is None:
+        outline = Outline()
+    for block in iter_markdown_blocks(markdown.split("\n")):
+        yield block_to_html_node(block, block_to_block_type(block), outline, links)
+
+def iter_markdown_html(markdown, outline=None, links=None):
+    #The html of markdown_to_html_node(markdown), one block at a time
+    yield "<div>"
+    for node in iter_block_nodes(markdown, outline, links):
+        yield node.to_html()
+    yield "</div>"
+
+def markdown_to_html(markdown, outline=None, links=None):
+    if block_cache.BLOCK_CACHE is None:
+        return "".join(iter_markdown_html(markdown, outline, links))
+    return blocks_to_html(markdown_to_blocks(markdown), outline, links)
+
+def blocks_to_html(blocks, outline=None, links=None, cache=None):
+    #Same html as markdown_to_html for a page given as its blocks, e.g. from
+    #iter_file_blocks, which are converted one at a time. cache defaults to
+    #the build's BLOCK_CACHE.
+    if cache is None:
+        cache = block_cache.BLOCK_CACHE
+    if outline is None:
+        outline = Outline()
+    parts = []
+    for block in blocks:
+        block_type = block_to_block_type(block)
+        if cache is None or block_type == BlockType.HEADING:
+            #A heading's id depends on the headings before it on the page
+            parts.append(block_to_html_node(block, block_type, outline, links).to_html())
+            continue
+        entry = cache.get(block, block_type)
+        if entry is None:
+            #Links are kept with the html, so a hit does not need the nodes
+            block_links = []
+            html = block_to_html_node(block, block_type, links=block_links).to_html()
+            cache.put(block, block_type, html, block_links)
+        else:
+            html, block_links = entry
+        if links is not None:
+            links.extend(block_links)
+        parts.append(html)
+    return "<div>" + "".join(parts) + "</div>"
+
+def block_to_html_node(block, block_type=None, outline=None, links=None):
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    match block_type:
+        case BlockType.HEADING:
+            return heading_to_html_node(block, outline, links)
+        case BlockType.CODE:
+            return code_to_html_node(block)
+        case BlockType.QUOTE:
+            return quote_to_html_node(block, links)
+        case BlockType.UNORDERED_LIST:
+            return unordered_list_to_html_node(block, links)
+        case BlockType.ORDERED_LIST:
+            return ordered_list_to_html_node(block, links)
+        case BlockType.PARAGRAPH:
+            return paragraph_to_html_node(block, links)
+        case _:
+            raise ValueError("unexpected block type")
+
+def text_to_children(text, links=None):
+    #links, when given, gets the (target, text, TextType) of each link and
+    #image in text. Both need a "[", so most text is not walked.
+    cache = inline_cache.INLINE_CACHE
+    if cache is not None:
+        nodes = list(cache.html_nodes(text))
     else:
-        #Above loops only completes if all lines are validated as an ordered list
-        return BlockType.ORDERED_LIST
+        nodes = parse_inline(text)
+    if links is not None and "[" in text:
+        links.extend(inline_links(nodes))
+    return nodes
+
+def paragraph_to_html_node(block, links=None):
+    #Lines of a paragraph are joined into one line of text
+    text = " ".join(block.split("\n"))
+    return ParentNode("p", text_to_children(text, links))
+
+_SLUG_DROP_RE = re.compile(r"[^\w\s-]")
+_SLUG_SPACE_RE = re.compile(r"\s+")
+
+def slugify(text):
+    slug = _SLUG_DROP_RE.sub("", text.lower()).strip()
+    return _SLUG_SPACE_RE.sub("-", slug)
+
+def split_heading(block):
+    level = len(block) - len(block.lstrip("#"))
+    return level, block[level + 1:]
+
+class Outline():
+    #Headings of one page in document order, as (level, text, id). Ids are
+    #unique within the page: a repeated slug gets -1, -2... appended.
+    def __init__(self):
+        self.headings = []
+        self.title = None #Text of the first h1, the page title
+        self._ids = set()
+        self._next = {} #slug -> first suffix that may still be free
+
+    def add(self, level, text):
+        #Returns the heading's id, "" if its text has nothing to slug
+        if level == 1 and self.title is None:
+            self.title = text
+        slug = slugify(text)
+        if not slug:
+            return ""
+        anchor = slug
+        number = self._next.get(slug, 1)
+        #Suffixes below number are taken, so a repeat does not search them
+        #again. The loop only runs on when a heading like "Usage 2" took one.
+        while anchor in self._ids:
+            anchor = f"{slug}-{number}"
+            number += 1
+        if anchor != slug:
+            self._next[slug] = number
+        self._ids.add(anchor)
+        self.headings.append((level, text, anchor))
+        return anchor
+
+    def ids(self):
+        return set(self._ids)
+
+    def to_html_node(self):
+        #Nested lists follow the heading levels, skipped levels nest once
+        items = []
+        lists = [] #(level, items) of every open list
+        for level, text, anchor in self.headings:
+            item = ParentNode("li", [LeafNode("a", text, {"href": f"#{anchor}"})])
+            while lists and lists[-1][0] > level:
+                lists.pop()
+            if not lists:
+                lists.append((level, items))
+            elif lists[-1][0] < level:
+                parent = lists[-1][1][-1]
+                if parent.children[-1].tag != "ul":
+                    parent.children.append(ParentNode("ul", []))
+                lists.append((level, parent.children[-1].children))
+            lists[-1][1].append(item)
+        return ParentNode("ul", items)
+
+    def to_html(self):
+        if not self.headings:
+            return ""
+        return self.to_html_node().to_html()
+
+def heading_to_html_node(block, outline=None, links=None):
+    level, text = split_heading(block)
+    children = text_to_children(text, links)
+    visible = inline_text(children)
+    anchor = outline.add(level, visible) if outline is not None else slugify(visible)
+    props = {"id": anchor} if anchor else None
+    return ParentNode(f"h{level}", children, props)
+
+def code_to_html_node(block):
+    #Code is not parsed as markdown, only the fences are removed.
+    #The rest of the opening fence line names the language.
+    text = block[3:-3]
+    language = None
+    if "\n" in text:
+        info, text = text.split("\n", 1)
+        language = language_name(info)
+    if language is None:
+        code = text_node_to_html_node(TextNode(text, TextType.CODE))
+        return ParentNode("pre", [code])
+
+    props = {"class": f"language-{language}"}
+    nodes = highlight(text, language)
+    if nodes is None or not text:
+        #Unknown languages keep the class for client-side highlighters
+        return ParentNode("pre", [LeafNode("code", text, props)])
+    return ParentNode("pre", [ParentNode("code", nodes, props)])
+
+def quote_to_html_node(block, links=None):
+    lines = [line.lstrip(">").strip() for line in block.split("\n")]
+    return ParentNode("blockquote", text_to_children(" ".join(lines), links))
+
+def unordered_list_to_html_node(block, links=None):
+    items = [ParentNode("li", text_to_children(line[2:], links)) for line in block.split("\n")]
+    return ParentNode("ul", items)
+
+def ordered_item_text(line):
+    #Drops the marker the way block_to_block_type matched it, "1.\t" included
+    return line[_ORDERED_ITEM_RE.match(line).end():]
+
+def ordered_list_to_html_node(block, links=None):
+    items = []
+    for line in block.split("\n"):
+        items.append(ParentNode("li", text_to_children(ordered_item_text(line), links)))
+    return ParentNode("ol", items)
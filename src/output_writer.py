@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import threading
+
+MANIFEST_VERSION = 1
+
+class OutputWriter():
+    #Writes pages only when their html differs from the previous build, so
+    #unchanged files keep their mtime for rsync, CDN uploads and browsers.
+    #owns(rel_path) tells whether a page belongs to this build, so a shard
+    #never reports or deletes the pages of other shards as removed.
+    def __init__(self, dest_dir, manifest_path, owns=None):
+        self.dest_dir = dest_dir
+        self.manifest_path = manifest_path
+        self.owns = owns
+        self.previous = {}
+        self.files = {}
+        self.changed = []
+        self.unchanged = 0
+        self.removed_assets = set() #Static files sync_static deleted
+        self._lock = threading.Lock() #The async build writes from several threads
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return #Without a manifest every page is written
+        if data.get("version") == MANIFEST_VERSION:
+            self.previous = data.get("files", {})
+
+    def rel_path(self, dest_path):
+        return os.path.relpath(dest_path, self.dest_dir).replace(os.sep, "/")
+
+    def is_current(self, dest_path, entry, content_hash):
+        #The stat catches files deleted or edited since the last build
+        if entry is None or entry[0] != content_hash:
+            return False
+        try:
+            stat = os.stat(dest_path)
+        except OSError:
+            return False
+        return stat.st_size == entry[1] and stat.st_mtime_ns == entry[2]
+
+    def write(self, dest_path, html):
+        #Returns True if the file was written
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        rel_path = self.rel_path(dest_path)
+        entry = self.previous.get(rel_path)
+        if self.is_current(dest_path, entry, content_hash):
+            with self._lock:
+                self.files[rel_path] = entry
+                self.unchanged += 1
+            return False
+
+        write_atomic(dest_path, data)
+        stat = os.stat(dest_path)
+        with self._lock:
+            self.files[rel_path] = [content_hash, stat.st_size, stat.st_mtime_ns]
+            self.changed.append(rel_path)
+        return True
+
+    def record_copy(self, dest_path):
+        #A static file copied by sync_static, listed with the changed pages
+        with self._lock:
+            self.changed.append(self.rel_path(dest_path))
+
+    def record_removal(self, dest_path):
+        with self._lock:
+            self.removed_assets.add(self.rel_path(dest_path))
+
+    def removed_pages(self):
+        #Pages of the last build that this build did not write
+        removed = set(self.previous) - set(self.files)
+        if self.owns is not None:
+            removed = {rel_path for rel_path in removed if self.owns(rel_path)}
+        return removed
+
+    def removed(self):
+        return sorted(self.removed_pages() | self.removed_assets)
+
+    def delete_removed(self):
+        #Deletes the output of removed pages, and directories left empty
+        for rel_path in sorted(self.removed_pages()):
+            dest_path = os.path.join(self.dest_dir, rel_path)
+            if not os.path.exists(dest_path):
+                continue
+            os.remove(dest_path)
+            dir_path = os.path.dirname(dest_path)
+            while os.path.normpath(dir_path) != os.path.normpath(self.dest_dir) and not os.listdir(dir_path):
+                os.rmdir(dir_path)
+                dir_path = os.path.dirname(dir_path)
+
+    def save(self, changed_path=None):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files}, file)
+        os.replace(tmp_path, self.manifest_path)
+
+        if changed_path is not None:
+            #Paths are relative to the output directory, for deploy tooling
+            with open(changed_path, "w", encoding="utf-8") as file:
+                json.dump({"changed": sorted(self.changed), "removed": self.removed()}, file, indent=2)
+
+def write_atomic(dest_path, data):
+    #Readers see the old file or the new one, never a partial write
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = f"{dest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,175 @@
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+#The active Profiler, or None. Stages marked with @instrument record into
+#it while it is set and only pay for one check when it is not.
+PROFILER = None
+
+class Profiler():
+    def __init__(self, trace=False):
+        self.stages = {}
+        self.pages = []
+        self.trace = trace
+        self.events = []
+        self._child_time = [0] #Time spent in nested stages, per open stage
+        self._page = None
+        self._start = time.perf_counter_ns()
+
+    def begin(self):
+        self._child_time.append(0)
+        return time.perf_counter_ns()
+
+    def end(self, stage, start, nodes=0, size=0, calls=1):
+        now = time.perf_counter_ns()
+        elapsed = now - start
+        child_time = self._child_time.pop()
+        self._child_time[-1] += elapsed
+
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = {"calls": 0, "total_ns": 0, "self_ns": 0, "nodes": 0, "bytes": 0}
+        stats["calls"] += calls
+        stats["total_ns"] += elapsed
+        stats["self_ns"] += elapsed - child_time
+        stats["nodes"] += nodes
+        stats["bytes"] += size
+
+        if self._page is not None:
+            page_stages = self._page["stages"]
+            page_stages[stage] = page_stages.get(stage, 0) + elapsed - child_time
+            self._page["nodes"] += nodes
+            self._page["bytes"] += size
+
+        if self.trace:
+            self._add_event(stage, "stage", start, elapsed)
+
+    def _add_event(self, name, category, start, elapsed):
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._start) / 1000,
+            "dur": elapsed / 1000,
+            "pid": os.getpid(),
+            "tid": 0,
+        })
+
+    @contextmanager
+    def page(self, name):
+        record = {"page": name, "seconds": 0.0, "stages": {}, "nodes": 0, "bytes": 0}
+        outer = self._page
+        self._page = record
+        start = time.perf_counter_ns()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self._page = outer
+            record["seconds"] = elapsed / 1e9
+            record["stages"] = {stage: ns / 1e9 for stage, ns in record["stages"].items()}
+            self.pages.append(record)
+            if self.trace:
+                self._add_event(name, "page", start, elapsed)
+
+    def report(self, top=10):
+        lines = [f"Slowest pages (of {len(self.pages)}):"]
+        for record in sorted(self.pages, key=lambda r: r["seconds"], reverse=True)[:top]:
+            lines.append(f"  {record['seconds'] * 1000:9.2f} ms  {record['bytes']:>9} B  {record['page']}")
+
+        lines.append("Hottest stages (by self time):")
+        lines.append(f"  {'stage':<24} {'calls':>9} {'self ms':>10} {'total ms':>10} {'nodes':>9} {'bytes':>10}")
+        hottest = sorted(self.stages.items(), key=lambda item: item[1]["self_ns"], reverse=True)
+        for stage, stats in hottest:
+            lines.append(
+                f"  {stage:<24} {stats['calls']:>9} {stats['self_ns'] / 1e6:>10.2f} "
+                f"{stats['total_ns'] / 1e6:>10.2f} {stats['nodes']:>9} {stats['bytes']:>10}"
+            )
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        #Chrome trace-event format, loadable in chrome://tracing or Perfetto
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, file)
+
+def enable(trace=False):
+    global PROFILER
+    if PROFILER is not None:
+        disable()
+    PROFILER = Profiler(trace)
+    return PROFILER
+
+def disable():
+    global PROFILER
+    profiler = PROFILER
+    PROFILER = None
+    return profiler
+
+@contextmanager
+def page(name):
+    #Attributes stage time to a page, does nothing when profiling is off
+    if PROFILER is None:
+        yield None
+        return
+    with PROFILER.page(name) as record:
+        yield record
+
+def count_items(result):
+    return len(result)
+
+def instrument(stage, nodes=None, size=None):
+    #Times every call of the decorated function as stage while profiling is
+    #enabled. nodes and size turn a stage's result into a node count and a
+    #byte count.
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = PROFILER
+            if profiler is None:
+                return func(*args, **kwargs)
+            start = profiler.begin()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                profiler.end(
+                    stage,
+                    start,
+                    nodes(result) if nodes is not None and result is not None else 0,
+                    size(result) if size is not None and result is not None else 0,
+                )
+        return wrapper
+    return decorator
+
+_DONE = object()
+
+def instrument_iter(stage):
+    #instrument for generator functions. The time spent producing items is
+    #one call of stage, with one node per item, so the consumer's work
+    #between items is not counted.
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = PROFILER
+            if profiler is None:
+                return func(*args, **kwargs)
+            return _timed_items(profiler, stage, func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+def _timed_items(profiler, stage, items):
+    calls = 1
+    while True:
+        start = profiler.begin()
+        item = _DONE
+        try:
+            item = next(items, _DONE)
+        finally:
+            profiler.end(stage, start, 0 if item is _DONE else 1, calls=calls)
+        if item is _DONE:
+            return
+        calls = 0
+        yield item
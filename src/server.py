@@ -0,0 +1,266 @@
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from block_cache import BlockCache
+from copystatic import copy_file, list_files, sync_static
+from gencontent import fill_page, find_pages, layout_for, render_blocks, source_name, write_page
+from markdown_blocks import Outline, iter_file_blocks
+from templates import load_template
+
+LIVE_RELOAD_PATH = "/__livereload"
+
+#Long-polls the server and reloads the page once the site version changes
+LIVE_RELOAD_SCRIPT = b"""<script>
+(function poll(version) {
+  fetch("/__livereload?version=" + version)
+    .then(function (response) { return response.text(); })
+    .then(function (next) {
+      if (version !== "" && next !== version) { location.reload(); return; }
+      poll(next);
+    })
+    .catch(function () { setTimeout(function () { poll(version); }, 1000); });
+})("");
+</script>"""
+
+class PageState():
+    __slots__ = ("mtime", "title", "content", "outline", "template")
+
+    def __init__(self, mtime, title, content, outline):
+        self.mtime = mtime
+        self.title = title
+        self.content = content
+        self.outline = outline
+        self.template = None #The compiled template the page was last written with
+
+class PageGraph():
+    #Keeps every page's rendered content in memory and its blocks in a block
+    #cache, so an edit only re-renders the blocks whose text changed
+    def __init__(self, content_dir, template_path, dest_dir, layouts=None):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.layouts = layouts or {}
+        self.pages = {}
+        self.blocks = BlockCache()
+        self.blocks_rendered = 0
+        self.version = 0
+        self._changed = threading.Condition()
+        self._template_errors = {}
+
+    def _load_templates(self):
+        #Compiled templates by path. The same object comes back until the
+        #template or a partial changes, a broken one is None.
+        templates = {}
+        for path in {self.template_path, *self.layouts.values()}:
+            try:
+                templates[path] = load_template(path)
+                self._template_errors.pop(path, None)
+            except Exception as error:
+                templates[path] = None
+                if self._template_errors.get(path) != str(error):
+                    print(f"{path}: {error}") #Once, not on every refresh
+                    self._template_errors[path] = str(error)
+        return templates
+
+    def update_page(self, from_path, dest_path, mtime, template):
+        outline = Outline()
+        misses = self.blocks.misses
+        title, content = render_blocks(iter_file_blocks(from_path), outline, cache=self.blocks)
+        #Headings are not cached, their ids depend on the headings before them
+        self.blocks_rendered += self.blocks.misses - misses + len(outline.headings)
+        self.pages[from_path] = PageState(mtime, title, content, outline)
+        self.write_page(from_path, dest_path, template)
+
+    def write_page(self, from_path, dest_path, template):
+        page = self.pages[from_path]
+        write_page(dest_path, fill_page(template, page.title, page.content, page.outline))
+        page.template = template
+
+    def refresh(self):
+        #Re-renders what changed on disk since the last call, returns the
+        #source paths that were rebuilt or removed
+        templates = self._load_templates()
+        changed = []
+        current = set()
+
+        for from_path, dest_path in find_pages(self.content_dir, self.dest_dir):
+            current.add(from_path)
+            page = self.pages.get(from_path)
+            template = templates[layout_for(source_name(from_path, self.content_dir), self.template_path,
+                                            self.layouts)]
+            if template is None:
+                continue #Keep the last version until its template is fixed
+            mtime = None
+            try:
+                mtime = os.stat(from_path).st_mtime_ns
+                if page is None or page.mtime != mtime:
+                    self.update_page(from_path, dest_path, mtime, template)
+                    changed.append(from_path)
+                elif page.template is not template:
+                    self.write_page(from_path, dest_path, template)
+                    changed.append(from_path)
+            except Exception as error:
+                #Keep serving the last good version while the page is broken,
+                #a page deleted since find_pages is removed on the next refresh
+                print(f"{from_path}: {error}")
+                if page is not None and mtime is not None:
+                    page.mtime = mtime
+
+        for from_path in sorted(set(self.pages) - current):
+            del self.pages[from_path]
+            rel_path = os.path.relpath(from_path, self.content_dir)
+            dest_path = os.path.join(self.dest_dir, rel_path[:-3] + ".html")
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            changed.append(from_path)
+
+        if changed:
+            self.bump_version()
+        return changed
+
+    def bump_version(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, version, timeout=25):
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+def inject_live_reload(html):
+    index = html.rfind(b"</body>")
+    if index == -1:
+        return html + LIVE_RELOAD_SCRIPT
+    return html[:index] + LIVE_RELOAD_SCRIPT + html[index:]
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    graph = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == LIVE_RELOAD_PATH:
+            self.live_reload(parse_qs(url.query).get("version", [""])[0])
+            return
+
+        path = self.translate_path(url.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+
+        with open(path, "rb") as file:
+            body = inject_live_reload(file.read())
+        self.send_body(body, "text/html; charset=utf-8")
+
+    def live_reload(self, version):
+        if version.isdigit():
+            current = self.graph.wait_for_change(int(version))
+        else:
+            current = self.graph.version
+        self.send_body(str(current).encode(), "text/plain")
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass #Keep the console for build messages
+
+class AssetWatcher():
+    #Copies static files whose mtime or size changed since the last sync and
+    #deletes the copies of removed ones. Only the static tree is scanned, the
+    #output tree is compared once by the first sync.
+    def __init__(self, static_dir, dest_dir):
+        self.static_dir = static_dir
+        self.dest_dir = dest_dir
+        self.files = None #Relative path -> (mtime, size) at the last sync
+
+    def scan(self):
+        files = {}
+        for rel_path in list_files(self.static_dir):
+            try:
+                stat = os.stat(os.path.join(self.static_dir, rel_path))
+            except FileNotFoundError:
+                continue #Deleted while the tree was listed
+            files[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def sync(self, pages=()):
+        #Returns True when an asset was copied or removed. pages are the
+        #relative paths of generated pages, which the first sync keeps.
+        if not os.path.isdir(self.static_dir):
+            return False
+        files = self.scan()
+        if self.files is None:
+            self.files = files
+            return sync_static(self.static_dir, self.dest_dir, keep=pages)["copied"] > 0
+
+        changed = False
+        for rel_path in sorted(files):
+            if self.files.get(rel_path) == files[rel_path]:
+                continue
+            dest_path = os.path.join(self.dest_dir, rel_path)
+            try:
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                copy_file(os.path.join(self.static_dir, rel_path), dest_path)
+                changed = True
+            except OSError as error:
+                print(f"{rel_path}: {error}")
+                files[rel_path] = None #Copied again on the next sync
+        for rel_path in sorted(self.files.keys() - files.keys()):
+            dest_path = os.path.join(self.dest_dir, rel_path)
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+                changed = True
+        self.files = files
+        return changed
+
+def watch(graph, assets, interval=0.25):
+    while True:
+        time.sleep(interval)
+        start = time.perf_counter()
+        try:
+            changed = graph.refresh()
+            if assets.sync() and not changed:
+                graph.bump_version()
+        except Exception as error:
+            #A broken template or a vanished directory must not stop watching
+            print(f"Rebuild failed: {error}")
+            continue
+        if changed:
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Rebuilt {len(changed)} pages in {elapsed:.1f} ms")
+
+def make_server(graph, host="localhost", port=8888):
+    handler = functools.partial(PreviewHandler, directory=graph.dest_dir)
+    PreviewHandler.graph = graph
+    return ThreadingHTTPServer((host, port), handler)
+
+def serve(content_dir, template_path, dest_dir, static_dir, port=8888, watch_files=False, layouts=None):
+    graph = PageGraph(content_dir, template_path, dest_dir, layouts)
+    assets = AssetWatcher(static_dir, dest_dir)
+    assets.sync({os.path.relpath(dest_path, dest_dir) for _, dest_path in find_pages(content_dir, dest_dir)})
+    graph.refresh()
+    print(f"Built {len(graph.pages)} pages")
+
+    if watch_files:
+        threading.Thread(target=watch, args=(graph, assets), daemon=True).start()
+
+    server = make_server(graph, port=port)
+    print(f"Serving {dest_dir} at http://localhost:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
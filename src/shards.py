@@ -0,0 +1,102 @@
+import json
+import os
+from xml.sax.saxutils import escape
+
+from enums import TextType
+from gencontent import extract_title
+from link_index import LinkIndex
+
+MANIFEST_VERSION = 1
+
+def parse_shard(text):
+    #"2/4" is the second of four shards
+    try:
+        number, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N: {text}") from None
+    if not 1 <= number <= count:
+        raise ValueError(f"Shard {number} is not between 1 and {count}")
+    return number, count
+
+class ShardManifest(LinkIndex):
+    #Pages, headings and links of one shard's share of the site, so the merge
+    #step can check links and write site-wide files without rendering again
+    def __init__(self, shard=None):
+        super().__init__()
+        self.shard = shard
+        self.titles = {} #page url -> title
+
+    def index_page(self, source_url, markdown):
+        super().index_page(source_url, markdown)
+        self.titles[source_url] = extract_title(markdown)
+
+    def add_rendered_page(self, source_url, title, anchors, links):
+        super().add_rendered_page(source_url, title, anchors, links)
+        self.titles[source_url] = title
+
+    def pages(self):
+        return sorted(self.titles)
+
+    def merge(self, other):
+        self.targets.update(other.targets)
+        self.links.extend(other.links)
+        self.titles.update(other.titles)
+
+    def save(self, path):
+        data = {
+            "version": MANIFEST_VERSION,
+            "shard": list(self.shard) if self.shard is not None else None,
+            "titles": self.titles,
+            "targets": {url: sorted(anchors) if anchors is not None else None
+                        for url, anchors in self.targets.items()},
+            "links": [[source_url, target, text, text_type.value]
+                      for source_url, target, text, text_type in self.links],
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"{path}: unsupported shard manifest version")
+        manifest = cls(tuple(data["shard"]) if data["shard"] is not None else None)
+        manifest.titles = data["titles"]
+        manifest.targets = {url: set(anchors) if anchors is not None else None
+                            for url, anchors in data["targets"].items()}
+        manifest.links = [(source_url, target, text, TextType(text_type))
+                          for source_url, target, text, text_type in data["links"]]
+        return manifest
+
+def merge_manifests(paths):
+    manifests = [ShardManifest.load(path) for path in paths]
+    shards = sorted(manifest.shard for manifest in manifests if manifest.shard is not None)
+    count = shards[0][1] if shards else 0
+    if len(shards) != len(manifests) or shards != [(number, count) for number in range(1, count + 1)]:
+        found = ", ".join(f"{number}/{total}" for number, total in shards)
+        raise ValueError(f"Expected one manifest for every shard, got: {found}")
+
+    merged = ShardManifest()
+    for manifest in manifests:
+        merged.merge(manifest)
+    return merged
+
+def write_sitemap(manifest, path, base_url=""):
+    base_url = base_url.rstrip("/")
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for url in manifest.pages():
+        lines.append(f"  <url><loc>{escape(base_url + url)}</loc></url>")
+    lines.append("</urlset>")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+
+def write_page_index(manifest, path):
+    #Every page with its title and heading ids, for search and navigation
+    pages = [{"url": url, "title": manifest.titles[url], "headings": sorted(manifest.targets[url])}
+             for url in manifest.pages()]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(pages, file, indent=1)
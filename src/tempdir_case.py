@@ -0,0 +1,22 @@
+import os
+import tempfile
+import unittest
+
+class TempDirTestCase(unittest.TestCase):
+    #Each test gets a temporary directory, removed after it, and helpers for
+    #the text files the test writes and reads in it
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, *names):
+        return os.path.join(self.tmp.name, *names)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def read(self, path):
+        with open(path, encoding="utf-8") as file:
+            return file.read()
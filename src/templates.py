@@ -0,0 +1,95 @@
+import os
+import re
+import time
+
+from build_cache import hash_file
+
+#{{ Name }} is a slot, {{> path }} includes a partial relative to the template
+_TAG_RE = re.compile(r"\{\{\s*(>?)\s*(.+?)\s*\}\}")
+
+SLOTS = ("Title", "Content", "TOC")
+
+#A file changed this close to being read may change again without its mtime
+#moving, so it is hashed again until it is older (git's racy-clean check)
+_RACY_NS = 2 * 10**9
+
+class Template():
+    def __init__(self, chunks, deps):
+        self.chunks = chunks #Static text at even indexes, slot names at odd ones
+        self.deps = deps #path -> [mtime_ns, sha256, read at] of the template and its partials
+        self.slots = set(chunks[1::2])
+
+    def render(self, values):
+        #Slots missing from values are left empty
+        parts = self.chunks[:]
+        parts[1::2] = [values.get(name, "") for name in self.chunks[1::2]]
+        return "".join(parts)
+
+    def is_current(self):
+        for path, entry in self.deps.items():
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                return False
+            if mtime == entry[0] and entry[2] - mtime > _RACY_NS:
+                continue
+            if hash_file(path) != entry[1]:
+                return False
+            entry[0] = mtime #Touched but not changed
+            entry[2] = time.time_ns()
+        return True
+
+def parse_template(text, base_dir=".", _including=()):
+    chunks = [""]
+    deps = {}
+    position = 0
+    for match in _TAG_RE.finditer(text):
+        chunks[-1] += text[position:match.start()]
+        position = match.end()
+        partial, name = match.groups()
+        if partial:
+            included = compile_template(os.path.join(base_dir, name), _including)
+            chunks[-1] += included.chunks[0]
+            chunks.extend(included.chunks[1:])
+            deps.update(included.deps)
+        elif name in SLOTS:
+            chunks.append(name)
+            chunks.append("")
+        else:
+            chunks[-1] += match.group() #Unknown placeholders are kept as written
+    chunks[-1] += text[position:]
+    return Template(chunks, deps)
+
+def compile_template(path, _including=()):
+    path = os.path.normpath(path)
+    if path in _including:
+        raise ValueError(f"Template includes itself: {path}")
+    #Hashed before it is read, so an edit in between fails the next check
+    read_at = time.time_ns()
+    mtime = os.stat(path).st_mtime_ns
+    content_hash = hash_file(path)
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    template = parse_template(text, os.path.dirname(path), _including + (path,))
+    template.deps = {path: [mtime, content_hash, read_at], **template.deps}
+    return template
+
+class TemplateCache():
+    #Compiled templates by path, recompiled when the template or one of its
+    #partials changed on disk
+    def __init__(self):
+        self.templates = {}
+        self.compiles = 0
+
+    def load(self, path):
+        template = self.templates.get(path)
+        if template is None or not template.is_current():
+            template = compile_template(path)
+            self.templates[path] = template
+            self.compiles += 1
+        return template
+
+TEMPLATES = TemplateCache()
+
+def load_template(path):
+    return TEMPLATES.load(path)
@@ -0,0 +1,82 @@
+import os
+import unittest
+from unittest import mock
+
+import async_build
+from async_build import generate_pages_async
+from build_cache import BuildCache, hash_file
+from gencontent import generate_pages_recursive, render_batch_in_worker
+from tempdir_case import TempDirTestCase
+
+class TestGeneratePagesAsync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(40):
+            self.write(os.path.join(self.content, f"dir{i % 3}", f"page{i}.md"), f"# Page {i}\n\nText with [a link](/{i})")
+
+    def assert_same_output(self, dest):
+        serial_dest = os.path.join(self.tmp.name, "serial")
+        generate_pages_recursive(self.content, self.template, serial_dest)
+        for i in range(40):
+            name = os.path.join(f"dir{i % 3}", f"page{i}.html")
+            self.assertEqual(self.read(os.path.join(dest, name)), self.read(os.path.join(serial_dest, name)))
+
+    def test_matches_serial_build(self):
+        self.assertEqual(generate_pages_async(self.content, self.template, self.dest, io_threads=4), 40)
+        self.assert_same_output(self.dest)
+
+    def test_with_worker_processes(self):
+        self.assertEqual(generate_pages_async(self.content, self.template, self.dest, jobs=2), 40)
+        self.assert_same_output(self.dest)
+
+    def test_pages_are_rendered_in_batches(self):
+        with mock.patch("async_build.render_batch_in_worker", wraps=render_batch_in_worker) as render:
+            self.assertEqual(generate_pages_async(self.content, self.template, self.dest, batch_bytes=300), 40)
+        self.assertEqual(sum(len(call.args[0]) for call in render.call_args_list), 40)
+        self.assertLess(render.call_count, 40)
+        self.assert_same_output(self.dest)
+
+    def test_layouts(self):
+        layout = os.path.join(self.tmp.name, "dir1.html")
+        self.write(layout, "<main>{{ Title }}</main>")
+        generate_pages_async(self.content, self.template, self.dest, jobs=2, layouts={"dir1": layout})
+        self.assertEqual(self.read(os.path.join(self.dest, "dir1", "page1.html")), "<main>Page 1</main>")
+        self.assertTrue(self.read(os.path.join(self.dest, "dir0", "page0.html")).startswith("<title>"))
+
+    def test_cache_skips_unchanged_pages(self):
+        cache_path = os.path.join(self.tmp.name, "cache.json")
+        cache = BuildCache(cache_path)
+        generate_pages_async(self.content, self.template, self.dest, cache)
+        cache.save()
+
+        self.write(os.path.join(self.content, "dir0", "page0.md"), "# Changed")
+        cache = BuildCache(cache_path)
+        self.assertEqual(generate_pages_async(self.content, self.template, self.dest, cache), 1)
+        self.assertEqual(cache.hits, 39)
+
+    def test_sources_are_read_once(self):
+        self.write(os.path.join(self.content, "dir0", "crlf.md"), "# CRLF\r\n\r\ntext\r\n")
+        cache = BuildCache(os.path.join(self.tmp.name, "cache.json"))
+        with mock.patch("async_build.read_source", wraps=async_build.read_source) as read, \
+             mock.patch("async_build.hash_file") as hash_source, \
+             mock.patch("gencontent.read_markdown") as read_markdown:
+            self.assertEqual(generate_pages_async(self.content, self.template, self.dest, cache), 41)
+        self.assertEqual(read.call_count, 41)
+        hash_source.assert_not_called()
+        read_markdown.assert_not_called()
+        path = os.path.join(self.content, "dir0", "page0.md")
+        self.assertEqual(cache.entries[path]["hash"], hash_file(path))
+        self.assertEqual(self.read(os.path.join(self.dest, "dir0", "crlf.html")),
+                         "<title>CRLF</title><div><h1 id=\"crlf\">CRLF</h1><p>text</p></div>")
+
+    def test_render_error_is_raised(self):
+        self.write(os.path.join(self.content, "dir1", "broken.md"), "No title on this page")
+        with self.assertRaises(ValueError):
+            generate_pages_async(self.content, self.template, self.dest, io_threads=2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from benchmark import generate_corpus, pathological_inputs, run_benchmark, run_pathological, compare
+
+class TestGenerateCorpus(unittest.TestCase):
+    def test_repeatable(self):
+        self.assertEqual(generate_corpus(pages=3, seed=7), generate_corpus(pages=3, seed=7))
+        self.assertNotEqual(generate_corpus(pages=3, seed=7), generate_corpus(pages=3, seed=8))
+
+    def test_page_count_and_title(self):
+        corpus = generate_corpus(pages=4, page_size=5)
+        self.assertEqual(len(corpus), 4)
+        self.assertTrue(all(page.startswith("# Page ") for page in corpus))
+
+    def test_link_density(self):
+        without_links = "".join(generate_corpus(pages=2, link_density=0.0))
+        with_links = "".join(generate_corpus(pages=2, link_density=0.5))
+        self.assertNotIn("](", without_links)
+        self.assertIn("](", with_links)
+
+    def test_code_ratio(self):
+        self.assertNotIn("```", "".join(generate_corpus(pages=2, code_ratio=0.0)))
+        self.assertIn("```", "".join(generate_corpus(pages=2, code_ratio=1.0)))
+
+class TestRunBenchmark(unittest.TestCase):
+    def test_reports_every_stage(self):
+        stages = run_benchmark(generate_corpus(pages=2, page_size=10), repeat=1)
+        self.assertEqual(list(stages), [
+            "markdown_to_blocks",
+            "block_to_block_type",
+            "parse_inline",
+            "markdown_to_html_node",
+            "to_html",
+        ])
+        self.assertEqual(stages["markdown_to_blocks"]["items"], 20)
+        self.assertGreater(stages["to_html"]["bytes"], 0)
+
+    def test_pathological(self):
+        results = run_pathological(size=400, repeat=1)
+        self.assertEqual(list(results), list(pathological_inputs(400)))
+        self.assertTrue(all(result["chars"] >= 390 for result in results.values()))
+
+    def test_compare(self):
+        old = {"stages": {"to_html": {"seconds": 2.0}}}
+        new = {"stages": {"to_html": {"seconds": 1.0}, "other": {"seconds": 1.0}}}
+        self.assertEqual(compare(old, new), "to_html                    0.50x")
+
+    def test_compare_zero_time(self):
+        old = {"stages": {"to_html": {"seconds": 0.0}}}
+        new = {"stages": {"to_html": {"seconds": 1.0}}}
+        self.assertEqual(compare(old, new), "to_html                      n/a")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+
+import block_cache
+from block_cache import BlockCache
+from enums import BlockType, TextType
+from gencontent import init_worker, render_pages
+from markdown_blocks import markdown_to_html, markdown_to_html_node
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_and_put(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("text", BlockType.PARAGRAPH))
+        cache.put("text", BlockType.PARAGRAPH, "<p>text</p>")
+        self.assertEqual(cache.get("text", BlockType.PARAGRAPH), ("<p>text</p>", ()))
+        self.assertIsNone(cache.get("text", BlockType.HEADING))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(max_bytes=20)
+        cache.put("a", BlockType.PARAGRAPH, "<p>a</p>")
+        cache.put("b", BlockType.PARAGRAPH, "<p>b</p>")
+        cache.get("a", BlockType.PARAGRAPH)
+        cache.put("c", BlockType.PARAGRAPH, "<p>c</p>")
+        self.assertIsNone(cache.get("b", BlockType.PARAGRAPH))
+        self.assertEqual(cache.get("a", BlockType.PARAGRAPH), ("<p>a</p>", ()))
+        self.assertLessEqual(cache.size, 20)
+
+    def test_persists_across_builds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.cache")
+            cache = BlockCache(path)
+            cache.put("a", BlockType.PARAGRAPH, "<p>a</p>")
+            cache.put("b", BlockType.PARAGRAPH, "<p>b</p>")
+            cache.save()
+
+            cache = BlockCache(path, max_bytes=8)
+            self.assertIsNone(cache.get("a", BlockType.PARAGRAPH))
+            self.assertEqual(cache.get("b", BlockType.PARAGRAPH), ("<p>b</p>", ()))
+
+    def test_links_are_kept(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.cache")
+            cache = BlockCache(path)
+            cache.put("[a](/a)", BlockType.PARAGRAPH, '<p><a href="/a">a</a></p>', [("/a", "a", TextType.LINK)])
+            cache.save()
+            cache = BlockCache(path)
+            self.assertEqual(cache.get("[a](/a)", BlockType.PARAGRAPH),
+                             ('<p><a href="/a">a</a></p>', (("/a", "a", TextType.LINK),)))
+
+    def test_corrupt_file_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.cache")
+            with open(path, "wb") as file:
+                file.write(b"not a cache")
+            self.assertEqual(BlockCache(path).size, 0)
+
+    def test_take_new_and_merge(self):
+        worker = BlockCache(track_new=True)
+        worker.put("a", BlockType.PARAGRAPH, "<p>a</p>")
+        parent = BlockCache()
+        parent.merge(worker.take_new())
+        self.assertEqual(parent.get("a", BlockType.PARAGRAPH), ("<p>a</p>", ()))
+        self.assertEqual(worker.take_new(), [])
+
+    def test_new_entries_are_not_kept_by_default(self):
+        #Serial builds and the preview server never call take_new
+        cache = BlockCache(max_bytes=20)
+        for i in range(100):
+            cache.put(f"block {i}", BlockType.PARAGRAPH, f"<p>block {i}</p>")
+        self.assertEqual(cache.take_new(), [])
+        self.assertLessEqual(cache.size, 20)
+
+class TestMarkdownToHTMLWithBlockCache(unittest.TestCase):
+    def tearDown(self):
+        block_cache.disable_block_cache()
+
+    def test_matches_uncached_html(self):
+        md = "# Changelog\n\n## 2.0\n\n- new\n\n## 1.0\n\n- old **stuff**\n\n```\ncode\n```"
+        expected = markdown_to_html_node(md).to_html()
+        self.assertEqual(markdown_to_html(md), expected)
+        cache = block_cache.enable_block_cache()
+        self.assertEqual(markdown_to_html(md), expected)
+        self.assertEqual(markdown_to_html(md), expected)
+        #Headings are not cached, their ids depend on the page
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+    def test_only_edited_block_misses(self):
+        cache = block_cache.enable_block_cache()
+        markdown_to_html("# Log\n\n- 1.1\n\n- 1.0")
+        markdown_to_html("# Log\n\n- 1.2\n\n- 1.0")
+        self.assertEqual(cache.misses, 3)
+
+    def test_repeated_headings_get_unique_ids(self):
+        block_cache.enable_block_cache()
+        md = "## Usage\n\ntext\n\n## Usage"
+        self.assertEqual(markdown_to_html(md), markdown_to_html_node(md).to_html())
+        self.assertIn('<h2 id="usage-1">', markdown_to_html(md))
+
+    def test_links_of_cached_blocks(self):
+        block_cache.enable_block_cache()
+        md = "# Home\n\n- [a](/a)\n\n![b](/b.png)"
+        for _ in range(2):
+            links = []
+            markdown_to_html(md, links=links)
+            self.assertEqual(links, [("/a", "a", TextType.LINK), ("/b.png", "b", TextType.IMAGE)])
+
+    def render_in_workers(self, tmp):
+        paths = []
+        for i in range(6):
+            paths.append(os.path.join(tmp, f"{i}.md"))
+            with open(paths[-1], "w", encoding="utf-8") as file:
+                file.write(f"# Page {i}\n\nshared block")
+        list(render_pages([(path, "{{ Content }}") for path in paths], jobs=2, batch_bytes=10))
+
+    def test_workers_return_new_blocks(self):
+        cache = block_cache.enable_block_cache()
+        with tempfile.TemporaryDirectory() as tmp:
+            self.render_in_workers(tmp)
+        self.assertEqual(cache.misses, 6 - cache.hits)
+        self.assertEqual(cache.get("shared block", BlockType.PARAGRAPH), ("<p>shared block</p>", ()))
+
+    def test_workers_read_the_cache_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.cache")
+            cache = block_cache.enable_block_cache(path)
+            cache.put("shared block", BlockType.PARAGRAPH, "<p>shared block</p>")
+            cache.save()
+            cache = block_cache.enable_block_cache(path)
+            self.render_in_workers(tmp)
+        self.assertEqual((cache.hits, cache.misses), (6, 0))
+
+    def test_only_workers_track_new_blocks(self):
+        self.assertFalse(block_cache.enable_block_cache().track_new)
+        init_worker(0, None, 1024)
+        self.assertTrue(block_cache.BLOCK_CACHE.track_new)
+
+if __name__ == "__main__":
+    unittest.main()
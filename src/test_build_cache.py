@@ -0,0 +1,60 @@
+import os
+import unittest
+
+from build_cache import BuildCache, hash_text
+from tempdir_case import TempDirTestCase
+
+class TestBuildCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_path = os.path.join(self.tmp.name, "cache.json")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.partial = os.path.join(self.tmp.name, "footer.html")
+        self.write(self.template, "<html>{{ Content }}</html>")
+        self.write(self.partial, "<footer></footer>")
+
+    def test_miss_then_hit(self):
+        cache = BuildCache(self.cache_path)
+        self.assertIsNone(cache.lookup("a.md", hash_text("# A")))
+        cache.store("a.md", hash_text("# A"), [self.template], "<h1>A</h1>")
+        cache.save()
+
+        cache = BuildCache(self.cache_path)
+        self.assertEqual(cache.lookup("a.md", hash_text("# A")), "<h1>A</h1>")
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_changed_source_misses(self):
+        cache = BuildCache(self.cache_path)
+        cache.store("a.md", hash_text("# A"), [self.template], "<h1>A</h1>")
+        self.assertIsNone(cache.lookup("a.md", hash_text("# A changed")))
+
+    def test_changed_dependency_only_invalidates_its_pages(self):
+        cache = BuildCache(self.cache_path)
+        cache.store("a.md", hash_text("# A"), [self.template], "A")
+        cache.store("b.md", hash_text("# B"), [self.template, self.partial], "B")
+        cache.save()
+
+        self.write(self.partial, "<footer>changed</footer>")
+        cache = BuildCache(self.cache_path)
+        self.assertEqual(cache.lookup("a.md", hash_text("# A")), "A")
+        self.assertIsNone(cache.lookup("b.md", hash_text("# B")))
+
+    def test_save_drops_pages_not_in_build(self):
+        cache = BuildCache(self.cache_path)
+        cache.store("a.md", hash_text("# A"), [self.template], "A")
+        cache.store("b.md", hash_text("# B"), [self.template], "B")
+        cache.save()
+
+        cache = BuildCache(self.cache_path)
+        cache.lookup("a.md", hash_text("# A"))
+        cache.save()
+        cache = BuildCache(self.cache_path)
+        self.assertNotIn("b.md", cache.entries)
+
+    def test_corrupt_cache_is_ignored(self):
+        self.write(self.cache_path, "{not json")
+        cache = BuildCache(self.cache_path)
+        self.assertEqual(cache.entries, {})
+
+if __name__ == "__main__":
+    unittest.main()
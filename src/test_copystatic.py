@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from copystatic import copy_file, is_unchanged, sync_static
+from tempdir_case import TempDirTestCase
+
+class TestSyncStatic(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png" * 1000)
+
+    def test_first_sync_copies_everything(self):
+        stats = sync_static(self.static, self.public)
+        self.assertEqual(stats, {"copied": 2, "unchanged": 0, "removed": 0})
+        self.assertEqual(self.read(os.path.join(self.public, "images", "logo.png")), "png" * 1000)
+
+    def test_second_sync_copies_nothing(self):
+        sync_static(self.static, self.public)
+        stats = sync_static(self.static, self.public)
+        self.assertEqual(stats, {"copied": 0, "unchanged": 2, "removed": 0})
+
+    def test_changed_file_is_copied(self):
+        sync_static(self.static, self.public)
+        css = os.path.join(self.static, "index.css")
+        self.write(css, "body { margin: 0 }")
+        stats = sync_static(self.static, self.public, threads=1)
+        self.assertEqual(stats["copied"], 1)
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body { margin: 0 }")
+
+    def test_stale_files_are_removed_but_kept_paths_stay(self):
+        sync_static(self.static, self.public)
+        self.write(os.path.join(self.public, "old", "stale.js"), "old")
+        self.write(os.path.join(self.public, "index.html"), "<html></html>")
+        stats = sync_static(self.static, self.public, keep={"index.html"})
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "old")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_hash_compare_ignores_mtime(self):
+        sync_static(self.static, self.public)
+        os.utime(os.path.join(self.public, "index.css"), (0, 0))
+        self.assertEqual(sync_static(self.static, self.public, compare="hash")["copied"], 0)
+        self.assertEqual(sync_static(self.static, self.public, compare="mtime")["copied"], 1)
+
+    def test_file_named_like_a_temp_file(self):
+        self.write(os.path.join(self.static, "index.css.tmp"), "backup")
+        sync_static(self.static, self.public, threads=4)
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body {}")
+        self.assertEqual(self.read(os.path.join(self.public, "index.css.tmp")), "backup")
+        self.assertEqual(sorted(os.listdir(self.public)), ["images", "index.css", "index.css.tmp"])
+
+    def test_invalid_compare(self):
+        with self.assertRaises(ValueError):
+            sync_static(self.static, self.public, compare="name")
+
+class TestCopyFile(unittest.TestCase):
+    def test_copy_keeps_content_and_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "src.bin")
+            dest = os.path.join(tmp, "dest.bin")
+            with open(src, "wb") as file:
+                file.write(os.urandom(3 * 1024 * 1024))
+            copy_file(src, dest)
+            with open(src, "rb") as a, open(dest, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+            self.assertTrue(is_unchanged(src, dest))
+            self.assertEqual(sorted(os.listdir(tmp)), ["dest.bin", "src.bin"])
+
+if __name__ == "__main__":
+    unittest.main()
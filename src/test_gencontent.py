@@ -0,0 +1,203 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from build_cache import BuildCache
+from enums import TextType
+from gencontent import (extract_title, generate_pages_recursive, batch_markdown, layout_for, parse_layout, render_file,
+                        render_page, render_pages)
+from markdown_blocks import Outline
+from tempdir_case import TempDirTestCase
+
+class TestExtractTitle(unittest.TestCase):
+    def test_title(self):
+        self.assertEqual(extract_title("# Hello "), "Hello")
+
+    def test_title_after_text(self):
+        self.assertEqual(extract_title("Intro\n\n## Sub\n\n# Main"), "Main")
+
+    def test_title_is_visible_text(self):
+        self.assertEqual(extract_title("# **Tips** & <tricks> for [links](/l)"), "Tips & <tricks> for links")
+
+    def test_no_title(self):
+        with self.assertRaises(ValueError):
+            extract_title("## Not a title")
+
+    def test_code_comment_is_not_title(self):
+        self.assertEqual(extract_title("```\n# not a heading\n```\n\n# Real"), "Real")
+
+    def test_render_takes_title_from_outline(self):
+        outline = Outline()
+        html = render_page("```\n# comment\n```\n\n# Real\n\n# Second", "{{ Title }}", outline)
+        self.assertEqual((html, outline.title), ("Real", "Real"))
+
+class TestRenderPage(unittest.TestCase):
+    def test_table_of_contents(self):
+        html = render_page("# Title\n\n## Part\n\n## Part", "<nav>{{ TOC }}</nav>{{ Content }}")
+        self.assertEqual(
+            html,
+            '<nav><ul><li><a href="#title">Title</a><ul><li><a href="#part">Part</a></li>'
+            '<li><a href="#part-1">Part</a></li></ul></li></ul></nav>'
+            '<div><h1 id="title">Title</h1><h2 id="part">Part</h2><h2 id="part-1">Part</h2></div>',
+        )
+
+    def test_template_without_toc(self):
+        self.assertEqual(render_page("# Title", "{{ Title }}"), "Title")
+
+    def test_title_is_escaped(self):
+        self.assertEqual(
+            render_page("# Tips & <tricks>", "<title>{{ Title }}</title>{{ Content }}"),
+            '<title>Tips &amp; &lt;tricks&gt;</title><div><h1 id="tips-tricks">Tips &amp; &lt;tricks&gt;</h1></div>',
+        )
+
+def write_sources(directory, markdowns):
+    paths = []
+    for i, markdown in enumerate(markdowns):
+        path = os.path.join(directory, f"{i}.md")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(markdown)
+        paths.append(path)
+    return paths
+
+class TestLayouts(unittest.TestCase):
+    def test_parse_layout(self):
+        self.assertEqual(parse_layout("./blog/=layouts/post.html"), ("blog", "layouts/post.html"))
+        for text in ("blog", "blog=", "=post.html", ".=post.html"):
+            with self.assertRaises(ValueError):
+                parse_layout(text)
+
+    def test_deepest_directory_wins(self):
+        layouts = {"docs": "docs.html", "docs/api": "api.html"}
+        self.assertEqual(layout_for("docs/api/v1/index.md", "site.html", layouts), "api.html")
+        self.assertEqual(layout_for("docs/guide.md", "site.html", layouts), "docs.html")
+        self.assertEqual(layout_for("docs.md", "site.html", layouts), "site.html")
+        self.assertEqual(layout_for("docsite/index.md", "site.html", layouts), "site.html")
+
+class TestRenderFile(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = "<title>{{ Title }}</title>{{ TOC }}{{ Content }}"
+
+    def render_mapped(self, markdown, outline=None, links=None):
+        path = write_sources(self.tmp.name, [markdown])[0]
+        with mock.patch("gencontent.MMAP_THRESHOLD", 1), mock.patch("markdown_blocks.MMAP_THRESHOLD", 1), \
+                mock.patch("gencontent.read_markdown") as read:
+            rendered = render_file(path, self.template, outline, links)
+        read.assert_not_called()
+        return rendered
+
+    def test_large_source_matches_render_page(self):
+        md = "Intro\n\n# Big **page**\n\n## Part\n\n- [a](/a)\n"
+        outline = Outline()
+        links = []
+        self.assertEqual(self.render_mapped(md, outline, links), (render_page(md, self.template), "Big page"))
+        self.assertEqual(sorted(outline.ids()), ["big-page", "part"])
+        self.assertEqual(links, [("/a", "a", TextType.LINK)])
+
+    def test_large_source_without_title(self):
+        with self.assertRaises(ValueError):
+            self.render_mapped("## Not a title\n\ntext")
+
+class TestRenderPages(unittest.TestCase):
+    def test_batches_small_pages_together(self):
+        batches = batch_markdown(["a" * 10, "b" * 10, "c" * 30, "d"], batch_bytes=20)
+        self.assertEqual(batches, [["a" * 10, "b" * 10], ["c" * 30], ["d"]])
+
+    def test_batches_sources_by_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_sources(tmp, ["a" * 10, "b" * 10, "c" * 30])
+            self.assertEqual(batch_markdown(paths, batch_bytes=20, size_of=os.path.getsize), [paths[:2], paths[2:]])
+
+    def test_parallel_matches_serial(self):
+        markdowns = [f"# Page {i}\n\nSome **bold** and a [link](/{i})" for i in range(20)]
+        template = "{{ Title }}:{{ Content }}"
+        with tempfile.TemporaryDirectory() as tmp:
+            pages = [(path, template) for path in write_sources(tmp, markdowns)]
+            self.assertEqual(list(render_pages(pages, jobs=3, batch_bytes=100)), list(render_pages(pages)))
+            self.assertEqual(list(render_pages(pages))[0][0], render_page(markdowns[0], template))
+
+class TestGeneratePagesRecursive(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nSome **text**")
+
+    def test_generates_nested_pages(self):
+        written = generate_pages_recursive(self.content, self.template, self.dest)
+        self.assertEqual(written, 2)
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "blog", "post.html")),
+            '<title>Post</title><div><h1 id="post">Post</h1><p>Some <b>text</b></p></div>',
+        )
+
+    def test_parallel_build_matches_serial(self):
+        for i in range(10):
+            self.write(os.path.join(self.content, "many", f"page{i}.md"), f"# Page {i}\n\n- item _{i}_")
+        serial_dest = os.path.join(self.tmp.name, "serial")
+        generate_pages_recursive(self.content, self.template, serial_dest)
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.dest, jobs=4), 12)
+        for i in range(10):
+            name = os.path.join("many", f"page{i}.html")
+            self.assertEqual(self.read(os.path.join(self.dest, name)), self.read(os.path.join(serial_dest, name)))
+
+    def test_cache_skips_unchanged_pages(self):
+        cache_path = os.path.join(self.tmp.name, "cache.json")
+        cache = BuildCache(cache_path)
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.dest, cache), 2)
+        cache.save()
+
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome back")
+        cache = BuildCache(cache_path)
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.dest, cache), 1)
+        self.assertIn("Welcome back", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_template_change_rebuilds_pages(self):
+        cache_path = os.path.join(self.tmp.name, "cache.json")
+        cache = BuildCache(cache_path)
+        generate_pages_recursive(self.content, self.template, self.dest, cache)
+        cache.save()
+
+        self.write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        cache = BuildCache(cache_path)
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.dest, cache), 2)
+
+    def test_layouts(self):
+        post_template = os.path.join(self.tmp.name, "post.html")
+        self.write(post_template, "<article>{{ Title }}</article>")
+        for jobs in (1, 2):
+            generate_pages_recursive(self.content, self.template, self.dest, jobs=jobs,
+                                     layouts={"blog": post_template})
+            self.assertEqual(self.read(os.path.join(self.dest, "blog", "post.html")), "<article>Post</article>")
+            self.assertTrue(self.read(os.path.join(self.dest, "index.html")).startswith("<title>Home</title>"))
+
+    def test_layout_change_rebuilds_pages(self):
+        post_template = os.path.join(self.tmp.name, "post.html")
+        self.write(post_template, "<article>{{ Title }}</article>")
+        cache_path = os.path.join(self.tmp.name, "cache.json")
+        cache = BuildCache(cache_path)
+        generate_pages_recursive(self.content, self.template, self.dest, cache)
+        cache.save()
+
+        cache = BuildCache(cache_path)
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.dest, cache,
+                                                  layouts={"blog": post_template}), 1)
+        self.assertEqual(self.read(os.path.join(self.dest, "blog", "post.html")), "<article>Post</article>")
+
+    def test_cached_page_is_restored_when_output_is_missing(self):
+        cache_path = os.path.join(self.tmp.name, "cache.json")
+        cache = BuildCache(cache_path)
+        generate_pages_recursive(self.content, self.template, self.dest, cache)
+        cache.save()
+
+        os.remove(os.path.join(self.dest, "index.html"))
+        cache = BuildCache(cache_path)
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.dest, cache), 1)
+        self.assertEqual(cache.hits, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from highlight import HIGHLIGHT_CACHE, highlight, language_name
+from htmlnode import LeafNode
+
+def tokens(nodes):
+    return [(node.props["class"][4:] if node.props else None, node.value) for node in nodes]
+
+class TestHighlight(unittest.TestCase):
+    def setUp(self):
+        HIGHLIGHT_CACHE.clear()
+
+    def test_language_name(self):
+        self.assertEqual(language_name("py"), "python")
+        self.assertEqual(language_name("YAML {.numbered}"), "yaml")
+        self.assertIsNone(language_name("  "))
+
+    def test_python(self):
+        self.assertEqual(tokens(highlight('def f(x=1): return "s" # done', "python")), [
+            ("keyword", "def"), (None, " "), ("function", "f"), (None, "(x="), ("number", "1"),
+            (None, "): "), ("keyword", "return"), (None, " "), ("string", '"s"'), (None, " "),
+            ("comment", "# done"),
+        ])
+
+    def test_python_keywords_inside_names(self):
+        self.assertEqual(tokens(highlight("format_if = None", "python")),
+                         [(None, "format_if = "), ("keyword", "None")])
+
+    def test_python_triple_quoted_string(self):
+        code = 'x = """a\n# not a comment\n"""'
+        self.assertEqual(tokens(highlight(code, "python")), [(None, "x = "), ("string", code[4:])])
+
+    def test_bash(self):
+        self.assertEqual(tokens(highlight('echo "$HOME" ${PATH} # path', "bash")), [
+            ("builtin", "echo"), (None, " "), ("string", '"$HOME"'), (None, " "),
+            ("variable", "${PATH}"), (None, " "), ("comment", "# path"),
+        ])
+
+    def test_json(self):
+        self.assertEqual(tokens(highlight('{"on": false, "n": -2.5e3}', "json")), [
+            (None, "{"), ("property", '"on"'), (None, ": "), ("keyword", "false"), (None, ", "),
+            ("property", '"n"'), (None, ": "), ("number", "-2.5e3"), (None, "}"),
+        ])
+
+    def test_yaml(self):
+        self.assertEqual(tokens(highlight("---\nname: site # comment\nport: 8888", "yaml")), [
+            ("keyword", "---"), (None, "\n"), ("property", "name"), (None, ": site "),
+            ("comment", "# comment"), (None, "\n"), ("property", "port"), (None, ": "),
+            ("number", "8888"),
+        ])
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight("fn main() {}", "rust"))
+
+    def test_spans_are_escaped(self):
+        html = "".join(node.to_html() for node in highlight('"<b>"', "json"))
+        self.assertEqual(html, '<span class="tok-string">"&lt;b&gt;"</span>')
+
+    def test_repeated_snippets_are_cached(self):
+        first = highlight("pip install site", "bash")
+        second = highlight("pip install site", "bash")
+        self.assertEqual((HIGHLIGHT_CACHE.hits, HIGHLIGHT_CACHE.misses), (1, 1))
+        self.assertIs(first[0], second[0])
+        highlight("pip install site", "yaml") #Same code, different language
+        self.assertEqual(HIGHLIGHT_CACHE.misses, 2)
+
+    def test_cached_nodes_are_frozen(self):
+        node = highlight('"a"', "json")[0]
+        with self.assertRaises(AttributeError):
+            node.value = '"b"'
+        with self.assertRaises(TypeError):
+            node.props["class"] = "tok-other"
+        self.assertEqual(highlight('"a"', "json")[0].to_html(), '<span class="tok-string">"a"</span>')
+
+    def test_plain_text_is_one_node(self):
+        self.assertEqual(highlight("a b c", "json"), [LeafNode(None, "a b c")])
+
+if __name__ == "__main__":
+    unittest.main()
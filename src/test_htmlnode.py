@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, freeze_node, freeze_props
 
 class TestHTMLNode(unittest.TestCase):   
     def test_eq(self):
@@ -61,6 +62,9 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode(None, "Text here")
         self.assertEqual(node.to_html(), "Text here")
     
+    def test_leaf_value_that_is_not_a_string(self):
+        self.assertEqual(LeafNode("td", 42).to_html(), "<td>42</td>")
+
     def leaf_to_html_no_value(self):
         node = LeafNode("p", None)
         with self.assertRaises(ValueError):
@@ -134,5 +138,95 @@ class TestParentNode(unittest.TestCase):
         self.assertTrue('id="main"' in html)
         self.assertTrue('data-test="test-div"' in html)
 
+class TestNodeSlots(unittest.TestCase):
+    def test_nodes_have_no_dict(self):
+        for node in (HTMLNode("p", "x"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = True
+
+    def test_text_leaf_has_no_props(self):
+        self.assertIsNone(LeafNode(None, "text").props)
+
+class TestEscaping(unittest.TestCase):
+    def test_leaf_text_is_escaped(self):
+        node = LeafNode("code", "if a < b && c > d")
+        self.assertEqual(node.to_html(), "<code>if a &lt; b &amp;&amp; c &gt; d</code>")
+
+    def test_text_leaf_is_escaped(self):
+        self.assertEqual(LeafNode(None, "<script>").to_html(), "&lt;script&gt;")
+
+    def test_quotes_in_text_are_kept(self):
+        self.assertEqual(LeafNode("p", 'say "hi"').to_html(), '<p>say "hi"</p>')
+
+    def test_attributes_are_escaped(self):
+        node = LeafNode("a", "x", {"href": '/search?q="a"&b=<c>'})
+        self.assertEqual(node.props_to_html(), ' href="/search?q=&quot;a&quot;&amp;b=&lt;c&gt;"')
+
+    def test_non_string_attribute(self):
+        self.assertEqual(HTMLNode("td", "", None, {"colspan": 2}).props_to_html(), ' colspan="2"')
+
+    def test_frozen_props_are_reused(self):
+        props = freeze_props({"class": "kw"})
+        first = LeafNode("span", "def", props)
+        second = LeafNode("span", "class", props)
+        self.assertEqual(first.to_html(), '<span class="kw">def</span>')
+        self.assertIs(first.props_to_html(), second.props_to_html())
+
+    def test_frozen_props_are_read_only(self):
+        with self.assertRaises(TypeError):
+            freeze_props({"class": "kw"})["class"] = "other"
+
+class TestFrozenNodes(unittest.TestCase):
+    def test_frozen_copy(self):
+        node = ParentNode("p", [LeafNode("a", "x", {"href": "/x"}), LeafNode(None, "y")])
+        frozen = freeze_node(node)
+        self.assertEqual(frozen, node)
+        self.assertEqual(frozen.to_html(), node.to_html())
+        self.assertIsInstance(frozen.children, tuple)
+        with self.assertRaises(AttributeError):
+            frozen.children[0].value = "z"
+        self.assertIs(freeze_node(frozen), frozen)
+
+    def test_original_is_unchanged(self):
+        node = ParentNode("p", [LeafNode("b", "x")])
+        freeze_node(node)
+        node.children.append(LeafNode(None, "y"))
+        self.assertEqual(node.to_html(), "<p><b>x</b>y</p>")
+
+class TestStreamingHTML(unittest.TestCase):
+    def test_base_node_not_implemented(self):
+        node = HTMLNode("p", "text")
+        with self.assertRaises(NotImplementedError):
+            node.to_html()
+
+    def test_iter_html_chunks(self):
+        node = ParentNode("div", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        self.assertEqual(list(node.iter_html()), ["<div>", "<b>bold</b>", " text", "</div>"])
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")]), ParentNode("li", [LeafNode(None, "two")])])
+        fp = io.StringIO()
+        node.write_html(fp)
+        self.assertEqual(fp.getvalue(), node.to_html())
+        self.assertEqual(fp.getvalue(), "<ul><li>one</li><li>two</li></ul>")
+
+    def test_leaf_iter_html(self):
+        node = LeafNode("a", "link", {"href": "/"})
+        self.assertEqual(list(node.iter_html()), ['<a href="/">link</a>'])
+
+    def test_deep_nesting_does_not_recurse(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 5000 + "deep"))
+        self.assertTrue(html.endswith("</span>" * 5000))
+
+    def test_invalid_child_raises_while_streaming(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+import inline_cache
+from inline_cache import InlineCache
+from gencontent import render_pages
+from htmlnode import LeafNode
+from markdown_blocks import markdown_to_html_node
+
+class TestInlineCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = InlineCache()
+        first = cache.html_nodes("Some **bold** text")
+        second = cache.html_nodes("Some **bold** text")
+        self.assertIs(first, second)
+        self.assertEqual(first, (LeafNode(None, "Some "), LeafNode("b", "bold"), LeafNode(None, " text")))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "size": 1, "maxsize": 4096})
+
+    def test_cached_nodes_are_read_only(self):
+        cache = InlineCache()
+        cache.html_nodes("[a **b**](/x)")
+        node = cache.html_nodes("[a **b**](/x)")[0] #A hit
+        with self.assertRaises(AttributeError):
+            node.tag = "span"
+        with self.assertRaises(TypeError):
+            node.props["class"] = "external"
+        with self.assertRaises(AttributeError):
+            node.children.append(LeafNode(None, "!"))
+        self.assertEqual(node.to_html(), '<a href="/x">a <b>b</b></a>')
+
+    def test_render(self):
+        cache = InlineCache()
+        self.assertEqual(cache.render("A [link](/x)"), 'A <a href="/x">link</a>')
+        self.assertEqual(cache.render("A [link](/x)"), 'A <a href="/x">link</a>')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        cache = InlineCache(maxsize=2)
+        cache.html_nodes("a")
+        cache.html_nodes("b")
+        cache.html_nodes("a") #"b" is now the least recently used
+        cache.html_nodes("c")
+        self.assertEqual(cache.stats()["size"], 2)
+        cache.html_nodes("a")
+        self.assertEqual(cache.hits, 2)
+        cache.html_nodes("b")
+        self.assertEqual(cache.misses, 4)
+
+    def test_unmatched_delimiters_are_text(self):
+        cache = InlineCache()
+        self.assertEqual(cache.html_nodes("an **unclosed"), (LeafNode(None, "an **unclosed"),))
+
+    def test_clear(self):
+        cache = InlineCache()
+        cache.html_nodes("a")
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "size": 0, "maxsize": 4096})
+
+class TestMarkdownWithInlineCache(unittest.TestCase):
+    def tearDown(self):
+        inline_cache.disable_inline_cache()
+
+    def test_same_output_with_cache(self):
+        md = "# Footer\n\n- **Note:** repeated\n- **Note:** repeated\n\n**Note:** repeated"
+        expected = markdown_to_html_node(md).to_html()
+        cache = inline_cache.enable_inline_cache()
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.hits, 6)
+
+    def test_worker_counts_are_merged(self):
+        cache = inline_cache.enable_inline_cache()
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(6):
+                paths.append(os.path.join(tmp, f"{i}.md"))
+                with open(paths[-1], "w", encoding="utf-8") as file:
+                    file.write(f"# Page {i}\n\nshared **text**")
+            list(render_pages([(path, "{{ Content }}") for path in paths], jobs=2, batch_bytes=10))
+        #Every heading misses, the shared paragraph misses once per worker
+        self.assertEqual(cache.hits + cache.misses, 12)
+        self.assertGreaterEqual(cache.hits, 4)
+
+if __name__ == "__main__":
+    unittest.main()
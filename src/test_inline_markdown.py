@@ -4,11 +4,12 @@ from inline_markdown import (
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    text_to_span_nodes,
     extract_markdown_links,
     extract_markdown_images
 )
 
-from textnode import TextNode
+from textnode import TextNode, SpanTextNode, text_node_to_html_node
 from enums import TextType
 
 class TestSplitNodesDelimiter(unittest.TestCase):
@@ -59,8 +60,8 @@ class TestSplitNodesDelimiter(unittest.TestCase):
             TextNode(" and an empty ", TextType.TEXT),
             TextNode(" delimiter", TextType.TEXT)
         ]
-        self.assertEqual(split_nodes_delimiter([node], "**", TextType.BOLD), expected_result)\
-        
+        self.assertEqual(split_nodes_delimiter([node], "**", TextType.BOLD), expected_result)
+
 class TestExtractMarkdownLinks(unittest.TestCase):
     def test_extract_link(self):
         text = "This a [link](https://example.com)"
@@ -254,8 +255,7 @@ class TestTextToTextNodes(unittest.TestCase):
             TextNode(" text", TextType.TEXT)
         ]
         self.assertListEqual(text_to_textnodes(text), expected_result)
-        with self.assertRaises(ValueError):
-            text_to_textnodes(text2)
+        self.assertListEqual(text_to_textnodes(text2), [TextNode(text2, TextType.TEXT)])
 
     def test_italic_to_textnode(self):
         text = "This is _italic_ text"
@@ -266,8 +266,7 @@ class TestTextToTextNodes(unittest.TestCase):
             TextNode(" text", TextType.TEXT)
         ]
         self.assertListEqual(text_to_textnodes(text), expected_result)
-        with self.assertRaises(ValueError):
-            text_to_textnodes(text2)
+        self.assertListEqual(text_to_textnodes(text2), [TextNode(text2, TextType.TEXT)])
 
     
     def test_code_to_textnode(self):
@@ -278,8 +277,7 @@ class TestTextToTextNodes(unittest.TestCase):
             TextNode("code", TextType.CODE)
         ]
         self.assertListEqual(text_to_textnodes(text), expected_result)
-        with self.assertRaises(ValueError):
-            text_to_textnodes(text2)
+        self.assertListEqual(text_to_textnodes(text2), [TextNode(text2, TextType.TEXT)])
 
     def test_mixed_markdown_emphasis(self):
         text = "This is a test with **bold text** and _italic text_ and `code`"
@@ -325,5 +323,102 @@ class TestTextToTextNodes(unittest.TestCase):
         ]
         self.assertListEqual(text_to_textnodes(text), expected_result)
 
+    def test_underscore_inside_link_url(self):
+        text = "See [the docs](https://example.com/some_page) for more"
+        expected_result = [
+            TextNode("See ", TextType.TEXT),
+            TextNode("the docs", TextType.LINK, "https://example.com/some_page"),
+            TextNode(" for more", TextType.TEXT)
+        ]
+        self.assertListEqual(text_to_textnodes(text), expected_result)
+
+    def test_delimiters_inside_code_are_literal(self):
+        text = "Use `a**b` to raise"
+        expected_result = [
+            TextNode("Use ", TextType.TEXT),
+            TextNode("a**b", TextType.CODE),
+            TextNode(" to raise", TextType.TEXT)
+        ]
+        self.assertListEqual(text_to_textnodes(text), expected_result)
+
+    def test_brackets_that_are_not_links(self):
+        text = "An [aside] and ![not an image] then a [link](https://example.com)"
+        expected_result = [
+            TextNode("An [aside] and ![not an image] then a ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "https://example.com")
+        ]
+        self.assertListEqual(text_to_textnodes(text), expected_result)
+
+    def test_nested_markup_is_flattened(self):
+        text = "**a _b_ c** and [see **docs**](/d)"
+        expected_result = [
+            TextNode("a b c", TextType.BOLD),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("see docs", TextType.LINK, "/d")
+        ]
+        self.assertListEqual(text_to_textnodes(text), expected_result)
+
+    def test_empty_text(self):
+        self.assertListEqual(text_to_textnodes(""), [TextNode("", TextType.TEXT)])
+
+    def test_many_links(self):
+        text = " ".join(f"[l{i}](https://example.com/{i})" for i in range(500))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 999)
+        self.assertEqual(nodes[-1], TextNode("l499", TextType.LINK, "https://example.com/499"))
+class TestTextToSpanNodes(unittest.TestCase):
+    text = "Some **bold**, _italic_, `code`, ![image](/i.png) and a [link](/l) here"
+
+    def test_matches_text_nodes(self):
+        self.assertListEqual(text_to_span_nodes(self.text), text_to_textnodes(self.text))
+
+    def test_spans_point_into_source(self):
+        nodes = text_to_span_nodes(self.text)
+        self.assertTrue(all(isinstance(node, SpanTextNode) and node.source is self.text for node in nodes))
+        self.assertEqual((nodes[1].start, nodes[1].end), (7, 11))
+        self.assertEqual((nodes[-2].start, nodes[-2].end), (self.text.index("link"), self.text.index("](/l)")))
+
+    def test_utf8_bytes_source(self):
+        text = "Caf\u00e9 **cr\u00e8me** [l\u00e9](/caf\u00e9) ![\u00e9](/\u00e9) fin"
+        nodes = text_to_span_nodes(text.encode("utf-8"))
+        self.assertTrue(all(isinstance(node.source, memoryview) for node in nodes))
+        self.assertListEqual(nodes, text_to_textnodes(text))
+        self.assertEqual(nodes[3].url, "/caf\u00e9")
+
+    def test_unmatched_delimiters_stay_text(self):
+        self.assertListEqual(text_to_span_nodes("an **unclosed _one"), [TextNode("an **unclosed _one", TextType.TEXT)])
+
+    def test_nested_markup_is_copied(self):
+        text = "**a _b_ c** then [x](/x) `empty`` ` end"
+        nodes = text_to_span_nodes(text)
+        self.assertListEqual(nodes, text_to_textnodes(text))
+        self.assertIsInstance(nodes[0], TextNode)
+
+    def test_interchangeable_for_html(self):
+        for span, node in zip(text_to_span_nodes(self.text), text_to_textnodes(self.text)):
+            self.assertEqual(text_node_to_html_node(span), text_node_to_html_node(node))
+
+    def test_empty_source(self):
+        self.assertListEqual(text_to_span_nodes(""), text_to_textnodes(""))
+        self.assertListEqual(text_to_span_nodes(b""), text_to_textnodes(""))
+
+    def test_text_is_read_once(self):
+        class CountingSpan(SpanTextNode):
+            __slots__ = ("reads",)
+
+            @property
+            def text(self):
+                self.reads += 1
+                return super().text
+
+        node = CountingSpan(self.text, 7, 11, TextType.BOLD)
+        node.reads = 0
+        self.assertEqual(text_node_to_html_node(node), text_node_to_html_node(TextNode("bold", TextType.BOLD)))
+        self.assertEqual(node.reads, 1)
+
+    def test_repr(self):
+        node = SpanTextNode("xboldx", 1, 5, TextType.BOLD)
+        self.assertEqual(repr(node), "SpanTextNode(bold, bold, None)")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+import time
+import unittest
+
+from benchmark import pathological_inputs, render_inline
+from inline_parser import inline_text, parse_inline
+
+class TestParseInline(unittest.TestCase):
+    def test_plain_text(self):
+        self.assertEqual(render_inline("just words"), "just words")
+        self.assertEqual(parse_inline(""), [])
+
+    def test_bold_inside_link(self):
+        self.assertEqual(render_inline("[a **b** c](/u)"), '<a href="/u">a <b>b</b> c</a>')
+
+    def test_italic_inside_bold(self):
+        self.assertEqual(render_inline("**a _b_ c**"), "<b>a <i>b</i> c</b>")
+
+    def test_link_inside_bold(self):
+        self.assertEqual(render_inline("**see [docs](/d)**"), '<b>see <a href="/d">docs</a></b>')
+
+    def test_emphasis_cannot_cross_a_link(self):
+        self.assertEqual(render_inline("**a [b** c](u)"), '**a <a href="u">b** c</a>')
+
+    def test_underscores_inside_words(self):
+        self.assertEqual(render_inline("snake_case_name and _it_"), "snake_case_name and <i>it</i>")
+
+    def test_links_do_not_nest(self):
+        self.assertEqual(render_inline("[a [b](c) d](e)"), '[a <a href="c">b</a> d](e)')
+
+    def test_images_do_not_nest(self):
+        self.assertEqual(render_inline("![![x](u)](v)"), '![<img src="u" alt="x"></img>](v)')
+
+    def test_image_inside_link(self):
+        self.assertEqual(render_inline("[![logo](/l.png)](/)"),
+                         '<a href="/"><img src="/l.png" alt="logo"></img></a>')
+
+    def test_code_takes_precedence(self):
+        self.assertEqual(render_inline("`**not bold**` and **bold**"),
+                         "<code>**not bold**</code> and <b>bold</b>")
+
+    def test_unmatched_delimiters_stay_literal(self):
+        for text in ("a ** b", "**open", "close**", "_x", "[text", "text]", "![alt](", "`tick"):
+            self.assertEqual(render_inline(text), text)
+
+    def test_inline_text(self):
+        self.assertEqual(inline_text(parse_inline("**Hi** [there](/t) ![you](/y.png)")), "Hi there you")
+
+class TestPathologicalInput(unittest.TestCase):
+    def test_linear_time(self):
+        #Each case is 100k characters built to defeat rescanning parsers
+        for name, text in pathological_inputs(100000).items():
+            start = time.perf_counter()
+            render_inline(text)
+            self.assertLess(time.perf_counter() - start, 1, name)
+
+if __name__ == "__main__":
+    unittest.main()
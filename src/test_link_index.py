@@ -0,0 +1,116 @@
+import os
+import unittest
+from unittest import mock
+
+from async_build import generate_pages_async
+from build_cache import BuildCache
+from enums import TextType
+from gencontent import generate_pages_recursive
+from link_index import LinkIndex, page_url, scan_page
+from tempdir_case import TempDirTestCase
+
+class TestScanPage(unittest.TestCase):
+    def test_links_images_and_anchors(self):
+        md = "# Title\n\nSee [docs](/docs) and ![logo](/logo.png)\n\n## Next _Step_\n\n```\n[not](/a-link)\n```"
+        links, anchors = scan_page(md)
+        self.assertEqual(links, [
+            ("/docs", "docs", TextType.LINK),
+            ("/logo.png", "logo", TextType.IMAGE),
+        ])
+        self.assertEqual(anchors, {"title", "next-step"})
+
+    def test_links_as_rendered(self):
+        #Nothing inside a code span, an image wrapped in a link gives both
+        links, _ = scan_page("`[x](/nope)` [![logo](/l.png)](/home)")
+        self.assertEqual(links, [
+            ("/home", "logo", TextType.LINK),
+            ("/l.png", "logo", TextType.IMAGE),
+        ])
+
+class TestLinkIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = LinkIndex()
+        self.index.add_page("/index.html", {"intro"})
+        self.index.add_page("/blog/post.html", {"setup", "usage"})
+        self.index.add_page("/blog/index.html", set())
+        self.index.add_file("/images/logo.png")
+
+    def broken_targets(self):
+        return [(target, reason) for _, target, _, _, reason in self.index.broken_links()]
+
+    def test_repeated_heading_anchors(self):
+        _, anchors = scan_page("# FAQ\n\n## Why\n\n## Why")
+        self.assertEqual(anchors, {"faq", "why", "why-1"})
+
+    def test_valid_links(self):
+        self.index.add_links("/blog/post.html", [
+            ("/", "home", TextType.LINK),
+            ("/blog/post", "pretty", TextType.LINK),
+            ("/blog/", "blog", TextType.LINK),
+            ("post.html#usage", "relative", TextType.LINK),
+            ("#setup", "same page", TextType.LINK),
+            ("../index.html#intro", "up", TextType.LINK),
+            ("/images/logo.png", "logo", TextType.IMAGE),
+            ("https://example.com/missing", "external", TextType.LINK),
+        ])
+        self.assertEqual(self.broken_targets(), [])
+
+    def test_broken_links(self):
+        self.index.add_links("/index.html", [
+            ("/missing", "missing", TextType.LINK),
+            ("/blog/post#nope", "bad anchor", TextType.LINK),
+            ("/images/gone.png", "image", TextType.IMAGE),
+        ])
+        self.assertEqual(self.broken_targets(), [
+            ("/missing", "missing page"),
+            ("/blog/post#nope", "missing anchor"),
+            ("/images/gone.png", "missing page"),
+        ])
+        self.assertIn("3 broken", self.index.report())
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("public", "blog", "post.html"), "public"), "/blog/post.html")
+
+class TestLinkIndexBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"),
+                   "# Home\n\n[post](/blog/post#details) and [gone](/blog/gone) `[x](/nope)`")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n## Details\n\n[![logo](/logo.png)](/)")
+
+    def broken(self, index):
+        return sorted(link[1] for link in index.broken_links())
+
+    def test_build_collects_links(self):
+        index = LinkIndex()
+        #Links come from the render itself, pages are not scanned again
+        with mock.patch("link_index.scan_page", side_effect=AssertionError):
+            generate_pages_recursive(self.content, self.template, self.dest, link_index=index)
+        self.assertEqual(self.broken(index), ["/blog/gone", "/logo.png"])
+        self.assertEqual(len(index.links), 4)
+
+    def test_cached_pages_keep_their_links(self):
+        cache = BuildCache(os.path.join(self.tmp.name, "cache.json"))
+        generate_pages_recursive(self.content, self.template, self.dest, cache, link_index=LinkIndex())
+        index = LinkIndex()
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.dest, cache, link_index=index), 0)
+        self.assertEqual(self.broken(index), ["/blog/gone", "/logo.png"])
+
+    def test_page_cached_without_links_is_rendered(self):
+        cache = BuildCache(os.path.join(self.tmp.name, "cache.json"))
+        generate_pages_recursive(self.content, self.template, self.dest, cache)
+        index = LinkIndex()
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.dest, cache, link_index=index), 2)
+        self.assertEqual(self.broken(index), ["/blog/gone", "/logo.png"])
+
+    def test_async_build_matches(self):
+        index = LinkIndex()
+        generate_pages_async(self.content, self.template, self.dest, jobs=2, link_index=index)
+        self.assertEqual(self.broken(index), ["/blog/gone", "/logo.png"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,21 @@
 import unittest
-from markdown_blocks import markdown_to_blocks, block_to_block_type
+import io
+import os
+import tempfile
+from unittest import mock
+
+import markdown_blocks
+from markdown_blocks import (
+    markdown_to_blocks,
+    iter_markdown_blocks,
+    iter_file_blocks,
+    iter_mapped_blocks,
+    block_to_block_type,
+    markdown_to_html_node,
+    iter_block_nodes,
+    iter_markdown_html,
+    Outline
+)
 from enums import BlockType
 
 
@@ -99,6 +115,68 @@ class TestMarkdownToBlocks(unittest.TestCase):
         ]   
         self.assertEqual(blocks, expected_result)
 
+class TestIterMarkdownBlocks(unittest.TestCase):
+    def test_matches_markdown_to_blocks(self):
+        md = """
+    # Heading
+
+    Paragraph line one
+       Paragraph line two   
+
+
+
+    - item
+    - item
+    """
+        blocks = list(iter_markdown_blocks(io.StringIO(md)))
+        self.assertEqual(blocks, markdown_to_blocks(md))
+
+    def test_lines_without_newlines(self):
+        lines = ["first", "block", "", "", "second"]
+        self.assertEqual(list(iter_markdown_blocks(lines)), ["first\nblock", "second"])
+
+    def test_whitespace_only_line_does_not_split(self):
+        lines = ["first\n", "   \n", "still first\n"]
+        self.assertEqual(list(iter_markdown_blocks(lines)), ["first\n\nstill first"])
+
+    def test_is_lazy(self):
+        blocks = iter_markdown_blocks(iter(["one", "", "two", ""]))
+        self.assertEqual(next(blocks), "one")
+        self.assertEqual(next(blocks), "two")
+
+    def test_iter_file_blocks(self):
+        md = "# Title\n\nSome **text**\nmore text\n\n- a\n- b\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(md)
+            self.assertEqual(list(iter_file_blocks(path)), markdown_to_blocks(md))
+
+    def test_iter_mapped_blocks(self):
+        md = ("\n\n# Título\n\n\n\n  Some **text**  \n more text\n \nsame block\n\n"
+              "```\ncode\n```\n\n\t\n\n- a\n- b")
+        with tempfile.TemporaryDirectory() as tmp:
+            for newline, name in (("\n", "lf.md"), ("\r\n", "crlf.md")):
+                path = os.path.join(tmp, name)
+                with open(path, "w", encoding="utf-8", newline=newline) as file:
+                    file.write(md)
+                self.assertEqual(list(iter_mapped_blocks(path)), markdown_to_blocks(md))
+
+            empty = os.path.join(tmp, "empty.md")
+            open(empty, "w").close()
+            self.assertEqual(list(iter_mapped_blocks(empty)), [])
+
+    def test_large_files_are_mapped(self):
+        md = "# Title\n\ntext\n"
+        mapped = mock.Mock(wraps=iter_mapped_blocks)
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.multiple(markdown_blocks, MMAP_THRESHOLD=len(md), iter_mapped_blocks=mapped):
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(md)
+            self.assertEqual(list(iter_file_blocks(path)), ["# Title", "text"])
+            mapped.assert_called_once_with(path)
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading_block(self):
         block = "# This is a heading"
@@ -130,5 +208,150 @@ class TestBlockToBlockType(unittest.TestCase):
         failed_block = "1. This\n3. is\n4. invalid"
         self.assertNotEqual(block_to_block_type(failed_block), BlockType.ORDERED_LIST)
 
+    def test_paragraph(self):
+        block = "This is just\na paragraph"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_failed_blocks_are_paragraphs(self):
+        for block in ["####### Too deep", "``` unclosed", ">quote\nno quote", "- item\n-item", "2. starts at two", "-"]:
+            self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_multiline_ordered_list(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 12))
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+
+class TestMarkdownToHTMLNode(unittest.TestCase):
+    def test_paragraphs(self):
+        md = """
+    This is **bolded** paragraph
+    text in a p
+    tag here
+
+    This is another paragraph with _italic_ text and `code` here
+
+    """
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p>"
+            "<p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    def test_codeblock(self):
+        md = """
+    ```
+    This is text that _should_ remain
+    the **same** even with inline stuff
+    ```
+    """
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    def test_codeblock_language(self):
+        node = markdown_to_html_node("```json\n{\"a\": 1}\n```")
+        self.assertEqual(
+            node.to_html(),
+            '<div><pre><code class="language-json">{<span class="tok-property">"a"</span>: '
+            '<span class="tok-number">1</span>}\n</code></pre></div>',
+        )
+
+    def test_codeblock_unknown_language(self):
+        node = markdown_to_html_node("```rust title=main.rs\nfn main() {}\n```")
+        self.assertEqual(node.to_html(), '<div><pre><code class="language-rust">fn main() {}\n</code></pre></div>')
+
+    def test_html_in_markdown_is_escaped(self):
+        node = markdown_to_html_node("Use <b> & friends\n\n```\nif a < b:\n```")
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>Use &lt;b&gt; &amp; friends</p><pre><code>if a &lt; b:\n</code></pre></div>",
+        )
+
+    def test_headings(self):
+        node = markdown_to_html_node("# Title\n\n### Sub _title_")
+        self.assertEqual(node.to_html(), '<div><h1 id="title">Title</h1><h3 id="sub-title">Sub <i>title</i></h3></div>')
+
+    def test_block_nodes_match_tree(self):
+        md = "# Title\n\nSome **bold**\n\n- a\n- b\n\n```py\nx = 1\n```\n\n# Title"
+        tree = markdown_to_html_node(md)
+        self.assertEqual(list(iter_block_nodes(md)), tree.children)
+        self.assertEqual("".join(iter_markdown_html(md)), tree.to_html())
+
+    def test_block_nodes_are_built_on_demand(self):
+        #A block is only converted once the nodes before it are used
+        outline = Outline()
+        nodes = iter_block_nodes("# One\n\ntext\n\n# Two", outline)
+        self.assertEqual(next(nodes).to_html(), '<h1 id="one">One</h1>')
+        self.assertEqual(next(nodes).to_html(), "<p>text</p>")
+        self.assertEqual([heading[2] for heading in outline.headings], ["one"])
+
+    def test_repeated_heading_ids(self):
+        outline = Outline()
+        node = markdown_to_html_node("## Setup\n\n## Setup\n\n## Setup 1\n\n## Setup", outline)
+        self.assertEqual([child.props["id"] for child in node.children],
+                         ["setup", "setup-1", "setup-1-1", "setup-2"])
+        self.assertEqual(outline.headings[1], (2, "Setup", "setup-1"))
+
+    def test_many_repeated_headings(self):
+        outline = Outline()
+        outline.add(2, "Step 2")
+        anchors = [outline.add(2, "Step") for _ in range(5000)]
+        self.assertEqual(anchors[:4], ["step", "step-1", "step-3", "step-4"])
+        self.assertEqual(anchors[-1], "step-5000")
+        self.assertEqual(len(outline.ids()), 5001)
+
+    def test_outline(self):
+        outline = Outline()
+        markdown_to_html_node("# Guide\n\n## Install `pip`\n\ntext\n\n### Linux\n\n## Use", outline)
+        self.assertEqual(outline.headings, [
+            (1, "Guide", "guide"), (2, "Install pip", "install-pip"), (3, "Linux", "linux"), (2, "Use", "use"),
+        ])
+        self.assertEqual(
+            outline.to_html(),
+            '<ul><li><a href="#guide">Guide</a><ul><li><a href="#install-pip">Install pip</a>'
+            '<ul><li><a href="#linux">Linux</a></li></ul></li><li><a href="#use">Use</a></li></ul></li></ul>',
+        )
+
+    def test_outline_skipped_levels(self):
+        outline = Outline()
+        markdown_to_html_node("## A\n\n#### B\n\n### C\n\n# D", outline)
+        self.assertEqual(
+            outline.to_html(),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#b">B</a></li><li><a href="#c">C</a></li></ul></li>'
+            '<li><a href="#d">D</a></li></ul>',
+        )
+
+    def test_empty_outline(self):
+        outline = Outline()
+        markdown_to_html_node("## !!!\n\ntext", outline)
+        self.assertEqual((outline.headings, outline.to_html()), ([], ""))
+
+    def test_heading_id_uses_visible_text(self):
+        node = markdown_to_html_node("## Read [the **docs**](/docs), now!")
+        self.assertEqual(node.children[0].props, {"id": "read-the-docs-now"})
+
+    def test_heading_without_slug_text(self):
+        node = markdown_to_html_node("# !!!")
+        self.assertEqual(node.to_html(), "<div><h1>!!!</h1></div>")
+
+    def test_quote(self):
+        node = markdown_to_html_node("> This is\n> a **quote**")
+        self.assertEqual(node.to_html(), "<div><blockquote>This is a <b>quote</b></blockquote></div>")
+
+    def test_lists(self):
+        md = "- one\n- [two](https://example.com)\n\n1. first\n2. second"
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><ul><li>one</li><li><a href="https://example.com">two</a></li></ul>'
+            "<ol><li>first</li><li>second</li></ol></div>",
+        )
+
+    def test_ordered_list_with_tabs(self):
+        node = markdown_to_html_node("1.\tone\n2.\t**two**")
+        self.assertEqual(node.to_html(), "<div><ol><li>one</li><li><b>two</b></li></ol></div>")
+
 if __name__ == "__main__":
     unittest.main()  
\ No newline at end of file
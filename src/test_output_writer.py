@@ -0,0 +1,129 @@
+import json
+import os
+import unittest
+
+from async_build import generate_pages_async
+from copystatic import sync_static
+from gencontent import generate_pages_recursive
+from output_writer import OutputWriter
+from tempdir_case import TempDirTestCase
+
+class TestOutputWriter(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.manifest = os.path.join(self.tmp.name, "manifest.json")
+
+    def page(self, name):
+        return os.path.join(self.dest, name)
+
+    def build(self, pages):
+        output = OutputWriter(self.dest, self.manifest)
+        for name, html in pages.items():
+            output.write(self.page(name), html)
+        output.save()
+        return output
+
+    def test_first_build_writes_everything(self):
+        output = self.build({"index.html": "<p>A</p>", "blog/post.html": "<p>B</p>"})
+        self.assertEqual(sorted(output.changed), ["blog/post.html", "index.html"])
+        with open(self.page("blog/post.html"), encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<p>B</p>")
+
+    def test_unchanged_pages_keep_their_mtime(self):
+        self.build({"index.html": "<p>A</p>", "about.html": "<p>B</p>"})
+        mtime = os.stat(self.page("index.html")).st_mtime_ns
+
+        output = self.build({"index.html": "<p>A</p>", "about.html": "<p>changed</p>"})
+        self.assertEqual(output.changed, ["about.html"])
+        self.assertEqual(output.unchanged, 1)
+        self.assertEqual(os.stat(self.page("index.html")).st_mtime_ns, mtime)
+
+    def test_missing_or_edited_file_is_rewritten(self):
+        self.build({"index.html": "<p>A</p>", "about.html": "<p>B</p>"})
+        os.remove(self.page("index.html"))
+        with open(self.page("about.html"), "w", encoding="utf-8") as file:
+            file.write("edited by hand")
+
+        output = self.build({"index.html": "<p>A</p>", "about.html": "<p>B</p>"})
+        self.assertEqual(sorted(output.changed), ["about.html", "index.html"])
+        with open(self.page("about.html"), encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<p>B</p>")
+
+    def test_changed_manifest(self):
+        self.build({"index.html": "<p>A</p>", "old.html": "<p>B</p>"})
+        output = OutputWriter(self.dest, self.manifest)
+        output.write(self.page("index.html"), "<p>A</p>")
+        output.write(self.page("new.html"), "<p>C</p>")
+        changed_path = os.path.join(self.tmp.name, "changed.json")
+        output.save(changed_path)
+        with open(changed_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file), {"changed": ["new.html"], "removed": ["old.html"]})
+
+    def test_removed_pages_are_deleted(self):
+        self.build({"index.html": "<p>A</p>", "blog/old.html": "<p>B</p>"})
+        output = OutputWriter(self.dest, self.manifest)
+        output.write(self.page("index.html"), "<p>A</p>")
+        output.delete_removed()
+        self.assertEqual(os.listdir(self.dest), ["index.html"])
+
+    def test_static_changes_in_changed_manifest(self):
+        static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(static, "css"))
+        with open(os.path.join(static, "css", "site.css"), "w", encoding="utf-8") as file:
+            file.write("body {}")
+        os.makedirs(self.dest)
+        with open(self.page("old.js"), "w", encoding="utf-8") as file:
+            file.write("old")
+
+        output = OutputWriter(self.dest, self.manifest)
+        sync_static(static, self.dest, output=output)
+        output.write(self.page("index.html"), "<p>A</p>")
+        changed_path = os.path.join(self.tmp.name, "changed.json")
+        output.save(changed_path)
+        with open(changed_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file), {"changed": ["css/site.css", "index.html"], "removed": ["old.js"]})
+
+    def test_removed_only_counts_owned_pages(self):
+        self.build({"a.html": "<p>A</p>", "b.html": "<p>B</p>", "c.html": "<p>C</p>"})
+        output = OutputWriter(self.dest, self.manifest, owns=lambda rel_path: rel_path != "c.html")
+        output.write(self.page("a.html"), "<p>A</p>")
+        self.assertEqual(output.removed(), ["b.html"])
+        output.delete_removed()
+        self.assertEqual(sorted(os.listdir(self.dest)), ["a.html", "c.html"])
+
+    def test_no_temporary_files_left(self):
+        self.build({"index.html": "<p>A</p>"})
+        self.assertEqual(os.listdir(self.dest), ["index.html"])
+
+class TestBuildWithOutputWriter(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.manifest = os.path.join(self.tmp.name, "manifest.json")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(6):
+            self.write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\nText {i}")
+
+    def check_rebuild(self, generate):
+        output = OutputWriter(self.dest, self.manifest)
+        generate(self.content, self.template, self.dest, output=output)
+        output.save()
+        self.assertEqual(len(output.changed), 6)
+
+        self.write(os.path.join(self.content, "page2.md"), "# Page 2\n\nNew text")
+        output = OutputWriter(self.dest, self.manifest)
+        generate(self.content, self.template, self.dest, output=output)
+        self.assertEqual(output.changed, ["page2.html"])
+        self.assertEqual(output.unchanged, 5)
+
+    def test_serial_build(self):
+        self.check_rebuild(generate_pages_recursive)
+
+    def test_async_build(self):
+        self.check_rebuild(generate_pages_async)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import unittest
+
+import markdown_blocks
+import profiling
+from htmlnode import HTMLNode
+from markdown_blocks import markdown_to_html_node
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(profiling.PROFILER)
+
+    def test_records_stages(self):
+        profiler = profiling.enable()
+        markdown_blocks.markdown_to_html_node("# Title\n\nSome **bold** text\n\n- a\n- b").to_html()
+        stages = profiler.stages
+        self.assertEqual(stages["markdown_to_blocks"]["calls"], 1)
+        self.assertEqual(stages["markdown_to_blocks"]["nodes"], 3)
+        self.assertEqual(stages["block_to_block_type"]["calls"], 3)
+        self.assertEqual(stages["parse_inline"]["calls"], 4)
+        self.assertEqual(stages["parse_inline"]["nodes"], 6)
+        self.assertGreater(stages["to_html"]["bytes"], 0)
+        self.assertLessEqual(stages["markdown_to_html_node"]["self_ns"], stages["markdown_to_html_node"]["total_ns"])
+
+    def test_records_build_splitting(self):
+        #The build splits pages through iter_markdown_html and iter_file_blocks
+        profiler = profiling.enable()
+        "".join(markdown_blocks.iter_markdown_html("# Title\n\ntext\n\nmore"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("# Title\n\ntext")
+            markdown_blocks.blocks_to_html(markdown_blocks.iter_file_blocks(path))
+        stats = profiler.stages["markdown_to_blocks"]
+        self.assertEqual((stats["calls"], stats["nodes"]), (2, 5))
+        self.assertLessEqual(stats["self_ns"], stats["total_ns"])
+
+    def test_disable_stops_recording(self):
+        profiler = profiling.enable()
+        self.assertIs(profiling.disable(), profiler)
+        markdown_to_html_node("# Title\n\ntext").to_html()
+        self.assertEqual(profiler.stages, {})
+
+    def test_stages_keep_their_names(self):
+        self.assertEqual(markdown_blocks.block_to_block_type.__name__, "block_to_block_type")
+        self.assertEqual(HTMLNode.to_html.__qualname__, "HTMLNode.to_html")
+
+    def test_page_report(self):
+        profiler = profiling.enable()
+        with profiling.page("slow.md"):
+            markdown_to_html_node("# Slow\n\n" + "text " * 1000).to_html()
+        with profiling.page("fast.md"):
+            markdown_to_html_node("# Fast").to_html()
+        self.assertEqual([record["page"] for record in profiler.pages], ["slow.md", "fast.md"])
+        self.assertGreater(profiler.pages[0]["bytes"], profiler.pages[1]["bytes"])
+        report = profiler.report()
+        self.assertIn("slow.md", report)
+        self.assertIn("parse_inline", report)
+
+    def test_page_without_profiler(self):
+        with profiling.page("page.md") as record:
+            self.assertIsNone(record)
+
+    def test_chrome_trace(self):
+        profiler = profiling.enable(trace=True)
+        with profiling.page("page.md"):
+            markdown_to_html_node("# Page").to_html()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.write_trace(path)
+            with open(path, encoding="utf-8") as file:
+                events = json.load(file)["traceEvents"]
+        self.assertIn("page.md", [event["name"] for event in events])
+        self.assertTrue(all(event["ph"] == "X" for event in events))
+
+if __name__ == "__main__":
+    unittest.main()
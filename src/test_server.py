@@ -0,0 +1,174 @@
+import os
+import threading
+import unittest
+import urllib.request
+from unittest import mock
+
+from gencontent import render_page
+from server import AssetWatcher, PageGraph, inject_live_reload, make_server, LIVE_RELOAD_SCRIPT
+from tempdir_case import TempDirTestCase
+
+class WatchedDirTestCase(TempDirTestCase):
+    def write(self, path, text):
+        super().write(path, text)
+        #Make sure the change is visible even on coarse mtime filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+class TestPageGraph(WatchedDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.page = os.path.join(self.content, "index.md")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(self.page, "# Home\n\nFirst **paragraph**\n\n- a\n- b\n\nLast paragraph")
+        self.graph = PageGraph(self.content, self.template, self.dest)
+
+    def test_initial_build_matches_generate(self):
+        self.assertEqual(self.graph.refresh(), [self.page])
+        markdown = self.read(self.page)
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "index.html")),
+            render_page(markdown, self.read(self.template)),
+        )
+        self.assertEqual(self.graph.blocks_rendered, 4)
+
+    def test_only_changed_blocks_are_rendered(self):
+        self.graph.refresh()
+        self.write(self.page, "# Home\n\nFirst **paragraph**\n\n- a\n- b\n\nEdited paragraph")
+        self.assertEqual(self.graph.refresh(), [self.page])
+        #The edited paragraph, and the heading which is always rendered for its id
+        self.assertEqual(self.graph.blocks_rendered, 6)
+        self.assertIn("<p>Edited paragraph</p>", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_unchanged_refresh_does_nothing(self):
+        self.graph.refresh()
+        version = self.graph.version
+        self.assertEqual(self.graph.refresh(), [])
+        self.assertEqual(self.graph.version, version)
+
+    def test_template_change_rewrites_without_rendering(self):
+        self.graph.refresh()
+        self.write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        self.assertEqual(self.graph.refresh(), [self.page])
+        self.assertEqual(self.graph.blocks_rendered, 4)
+        self.assertTrue(self.read(os.path.join(self.dest, "index.html")).startswith("<h2>Home</h2>"))
+
+    def test_layout_change_rewrites_its_pages(self):
+        layout = os.path.join(self.tmp.name, "blog.html")
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(layout, "<article>{{ Title }}</article>")
+        self.write(post, "# Post")
+        graph = PageGraph(self.content, self.template, self.dest, {"blog": layout})
+        graph.refresh()
+        self.assertEqual(self.read(os.path.join(self.dest, "blog", "post.html")), "<article>Post</article>")
+
+        self.write(layout, "<section>{{ Title }}</section>")
+        self.assertEqual(graph.refresh(), [post])
+        self.assertEqual(self.read(os.path.join(self.dest, "blog", "post.html")), "<section>Post</section>")
+
+    def test_broken_template_keeps_pages(self):
+        self.graph.refresh()
+        os.remove(self.template)
+        self.assertEqual(self.graph.refresh(), [])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_removed_page_is_deleted(self):
+        other = os.path.join(self.content, "other.md")
+        self.write(other, "# Other")
+        self.graph.refresh()
+        os.remove(other)
+        self.assertEqual(self.graph.refresh(), [other])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "other.html")))
+
+    def test_broken_page_keeps_last_version(self):
+        self.graph.refresh()
+        self.write(self.page, "No title on this page")
+        self.assertEqual(self.graph.refresh(), [])
+        self.assertIn("First", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_any_page_error_keeps_last_version(self):
+        self.graph.refresh()
+        self.write(self.page, "# Home\n\nEdited")
+        with mock.patch("server.render_blocks", side_effect=IndexError("list index out of range")):
+            self.assertEqual(self.graph.refresh(), [])
+        self.assertIn("First", self.read(os.path.join(self.dest, "index.html")))
+        self.assertEqual(self.graph.refresh(), []) #Not retried until the page changes again
+
+    def test_page_deleted_during_refresh(self):
+        missing = os.path.join(self.content, "gone.md")
+        pages = [(missing, os.path.join(self.dest, "gone.html")), (self.page, os.path.join(self.dest, "index.html"))]
+        with mock.patch("server.find_pages", return_value=pages):
+            self.assertEqual(self.graph.refresh(), [self.page])
+
+    def test_blocks_are_shared_between_pages(self):
+        self.write(os.path.join(self.content, "copy.md"), "# Copy\n\nFirst **paragraph**")
+        self.graph.refresh()
+        #Both headings, and the page blocks rendered once
+        self.assertEqual(self.graph.blocks_rendered, 5)
+
+    def test_live_reload_over_http(self):
+        self.graph.refresh()
+        server = make_server(self.graph, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://localhost:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(base + "/") as response:
+                self.assertIn(LIVE_RELOAD_SCRIPT, response.read())
+            with urllib.request.urlopen(base + "/__livereload?version=") as response:
+                self.assertEqual(response.read(), b"1")
+
+            threading.Timer(0.1, self.graph.bump_version).start()
+            with urllib.request.urlopen(base + "/__livereload?version=1") as response:
+                self.assertEqual(response.read(), b"2")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+class TestAssetWatcher(WatchedDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.asset = os.path.join(self.static, "css", "site.css")
+        self.copy = os.path.join(self.dest, "css", "site.css")
+        self.write(self.asset, "body {}")
+        self.watcher = AssetWatcher(self.static, self.dest)
+
+    def test_first_sync_keeps_pages(self):
+        self.write(os.path.join(self.dest, "index.html"), "page")
+        self.write(os.path.join(self.dest, "stale.txt"), "old")
+        self.assertTrue(self.watcher.sync({"index.html"}))
+        self.assertEqual(sorted(os.listdir(self.dest)), ["css", "index.html"])
+
+    def test_only_changed_assets_are_copied(self):
+        self.watcher.sync()
+        with mock.patch("server.sync_static") as sync_static, mock.patch("server.copy_file") as copy:
+            self.assertFalse(self.watcher.sync())
+        sync_static.assert_not_called()
+        copy.assert_not_called()
+
+        self.write(self.asset, "body { margin: 0 }")
+        self.assertTrue(self.watcher.sync())
+        with open(self.copy, encoding="utf-8") as file:
+            self.assertEqual(file.read(), "body { margin: 0 }")
+
+    def test_removed_asset_is_deleted(self):
+        self.watcher.sync()
+        os.remove(self.asset)
+        self.assertTrue(self.watcher.sync())
+        self.assertFalse(os.path.exists(self.copy))
+
+class TestInjectLiveReload(unittest.TestCase):
+    def test_before_body_end(self):
+        html = inject_live_reload(b"<body><p>x</p></body></html>")
+        self.assertTrue(html.startswith(b"<body><p>x</p><script>"))
+        self.assertTrue(html.endswith(b"</script></body></html>"))
+
+    def test_without_body(self):
+        self.assertEqual(inject_live_reload(b"<p>x</p>"), b"<p>x</p>" + LIVE_RELOAD_SCRIPT)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from enums import TextType
+from gencontent import find_pages, generate_pages_recursive, select_shard, shard_of
+from shards import ShardManifest, merge_manifests, parse_shard
+from tempdir_case import TempDirTestCase
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+class TestSharding(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual(shard_of("blog/post.md", 4), shard_of("blog/post.md", 4))
+        self.assertEqual(shard_of("blog/post.md", 1), 0)
+
+    def test_every_page_is_in_one_shard(self):
+        pages = [(os.path.join("content", f"page{i}.md"), f"page{i}.html") for i in range(50)]
+        shards = [select_shard(pages, "content", (number, 3)) for number in (1, 2, 3)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(pages))
+        self.assertTrue(all(shards)) #50 pages leave no shard empty
+
+    def test_manifest_round_trip(self):
+        manifest = ShardManifest((2, 3))
+        manifest.index_page("/index.html", "# Home\n\n## Intro\n\n[post](/post) ![logo](/logo.png)")
+        manifest.add_file("/logo.png")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shard.json")
+            manifest.save(path)
+            loaded = ShardManifest.load(path)
+        self.assertEqual(loaded.shard, (2, 3))
+        self.assertEqual(loaded.titles, {"/index.html": "Home"})
+        self.assertEqual(loaded.targets, {"/index.html": {"home", "intro"}, "/logo.png": None})
+        self.assertEqual(loaded.links, manifest.links)
+        self.assertEqual(loaded.links[1][3], TextType.IMAGE)
+
+    def test_merge_needs_every_shard(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for number in (1, 3):
+                paths.append(os.path.join(tmp, f"{number}.json"))
+                ShardManifest((number, 3)).save(paths[-1])
+            with self.assertRaises(ValueError):
+                merge_manifests(paths)
+
+class TestShardedBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.template = self.path("template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(self.path("static", "logo.png"), "png")
+        for i in range(12):
+            self.write(os.path.join(self.content, f"dir{i % 3}", f"page{i}.md"),
+                       f"# Page {i}\n\n## Part\n\n[next](/dir{(i + 1) % 3}/page{(i + 1) % 12}#part)")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![logo](/logo.png) [gone](/gone)")
+
+    def run_shards(self, count):
+        #One process per shard, each with its own output directory
+        processes = []
+        for number in range(1, count + 1):
+            work = self.path(f"shard{number}")
+            os.makedirs(work)
+            processes.append(subprocess.Popen(
+                [sys.executable, MAIN, "build", "--content", self.content, "--template", self.template,
+                 "--static", self.path("static"), "--dest", os.path.join(work, "public"),
+                 "--shard", f"{number}/{count}", "--shard-manifest", os.path.join(work, "manifest.json")],
+                cwd=work, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+            ))
+        for process in processes:
+            output = process.communicate()[0]
+            self.assertEqual(process.returncode, 0, output)
+        return [self.path(f"shard{number}") for number in range(1, count + 1)]
+
+    def test_shards_match_a_single_build(self):
+        serial = self.path("serial")
+        generate_pages_recursive(self.content, self.template, serial)
+        shards = self.run_shards(3)
+
+        built = {}
+        for work in shards:
+            dest = os.path.join(work, "public")
+            for _, dest_path in find_pages(self.content, dest):
+                if os.path.exists(dest_path):
+                    self.assertNotIn(dest_path[len(dest):], built)
+                    built[dest_path[len(dest):]] = self.read(dest_path)
+        self.assertEqual(len(built), 13)
+        for name, html in built.items():
+            self.assertEqual(html, self.read(serial + name))
+        self.assertTrue(os.path.exists(os.path.join(shards[0], "public", "logo.png")))
+        self.assertFalse(os.path.exists(os.path.join(shards[1], "public", "logo.png")))
+
+    def test_shard_state_files(self):
+        work = self.path("work")
+        os.makedirs(work)
+        def build(*args):
+            subprocess.run([sys.executable, MAIN, "build", "--content", self.content, "--template", self.template,
+                            "--static", self.path("static"), "--dest", "public"] + list(args),
+                           cwd=work, capture_output=True, text=True, check=True)
+        build()
+        #Reusing the full build's manifest must not remove the other shards' pages
+        build("--shard", "2/3", "--output-manifest", ".output_manifest.json", "--changed-manifest", "changed.json")
+        with open(os.path.join(work, "changed.json"), encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["removed"], [])
+        self.assertEqual(len(find_pages(self.content, os.path.join(work, "public"))), 13)
+        for _, dest_path in find_pages(self.content, os.path.join(work, "public")):
+            self.assertTrue(os.path.exists(dest_path), dest_path)
+
+        build("--shard", "2/3")
+        self.assertTrue(os.path.exists(os.path.join(work, ".build_cache.2-of-3.json")))
+        self.assertTrue(os.path.exists(os.path.join(work, ".output_manifest.2-of-3.json")))
+
+    def test_merge(self):
+        shards = self.run_shards(3)
+        site = self.path("site")
+        result = subprocess.run(
+            [sys.executable, MAIN, "merge", "--dest", site, "--base-url", "https://example.com/",
+             "--check-links"] + [os.path.join(work, "manifest.json") for work in shards],
+            capture_output=True, text=True, check=True,
+        )
+        #Cross-shard links and anchors resolve, only the missing page is broken
+        self.assertIn("Merged 3 shards, 13 pages", result.stdout)
+        self.assertIn("Checked 14 links, 1 broken", result.stdout)
+        self.assertIn("/gone (missing page)", result.stdout)
+
+        sitemap = self.read(os.path.join(site, "sitemap.xml"))
+        self.assertEqual(sitemap.count("<loc>"), 13)
+        self.assertIn("<loc>https://example.com/dir1/page4.html</loc>", sitemap)
+        with open(os.path.join(site, "pages.json"), encoding="utf-8") as file:
+            pages = json.load(file)
+        self.assertEqual(pages[0], {"url": "/dir0/page0.html", "title": "Page 0", "headings": ["page-0", "part"]})
+
+if __name__ == "__main__":
+    unittest.main()
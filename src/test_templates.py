@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+from build_cache import BuildCache
+from gencontent import generate_pages_recursive
+from templates import TemplateCache, compile_template, parse_template
+
+class TestParseTemplate(unittest.TestCase):
+    def test_static_chunks_and_slots(self):
+        template = parse_template("<title>{{ Title }}</title>{{Content}}")
+        self.assertEqual(template.chunks, ["<title>", "Title", "</title>", "Content", ""])
+        self.assertEqual(template.slots, {"Title", "Content"})
+
+    def test_render(self):
+        template = parse_template("<h1>{{ Title }}</h1>{{ TOC }}{{ Content }}<p>{{ Title }}</p>")
+        self.assertEqual(template.render({"Title": "A", "Content": "<p>B</p>"}), "<h1>A</h1><p>B</p><p>A</p>")
+
+    def test_unknown_placeholders_are_kept(self):
+        template = parse_template("{{ Author }}: {{ Title }}")
+        self.assertEqual(template.render({"Title": "A"}), "{{ Author }}: A")
+
+    def test_no_slots(self):
+        self.assertEqual(parse_template("plain").render({}), "plain")
+
+class TestTemplateFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template = self.path("layout.html")
+        self.write("layout.html", "<body>{{> partials/nav.html }}{{ Content }}{{> partials/footer.html }}</body>")
+        self.write("partials/nav.html", "<nav>{{ TOC }}</nav>")
+        self.write("partials/footer.html", "<footer>{{> copyright.html }}</footer>")
+        self.write("partials/copyright.html", "(c) {{ Title }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def write(self, name, text, age=0):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        if age:
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - age * 10**9))
+
+    def test_partials_are_inlined(self):
+        template = compile_template(self.template)
+        self.assertEqual(
+            template.render({"Title": "Site", "Content": "<p>x</p>", "TOC": "<ul></ul>"}),
+            "<body><nav><ul></ul></nav><p>x</p><footer>(c) Site</footer></body>",
+        )
+        self.assertEqual(
+            [os.path.relpath(path, self.tmp.name) for path in template.deps],
+            ["layout.html", "partials/nav.html", "partials/footer.html", "partials/copyright.html"],
+        )
+
+    def test_partial_including_itself(self):
+        self.write("partials/copyright.html", "{{> footer.html }}")
+        with self.assertRaises(ValueError):
+            compile_template(self.template)
+
+    def test_cache_recompiles_when_a_partial_changes(self):
+        cache = TemplateCache()
+        first = cache.load(self.template)
+        self.assertIs(cache.load(self.template), first)
+        self.write("partials/copyright.html", "(c) 2026")
+        second = cache.load(self.template)
+        self.assertIsNot(second, first)
+        self.assertIn("(c) 2026", second.render({}))
+        self.assertEqual(cache.compiles, 2)
+
+    def test_touched_file_is_not_recompiled(self):
+        self.write("partials/nav.html", "<nav>{{ TOC }}</nav>", age=10)
+        cache = TemplateCache()
+        first = cache.load(self.template)
+        self.write("partials/nav.html", "<nav>{{ TOC }}</nav>")
+        self.assertIs(cache.load(self.template), first)
+
+    def test_partial_change_invalidates_build_cache(self):
+        content = self.path("content")
+        dest = self.path("public")
+        self.write("content/index.md", "# Home\n\ntext")
+        cache = BuildCache(self.path("cache.json"))
+        self.assertEqual(generate_pages_recursive(content, self.template, dest, cache), 1)
+        cache.save()
+
+        cache = BuildCache(self.path("cache.json"))
+        self.assertEqual(generate_pages_recursive(content, self.template, dest, cache), 0)
+        self.write("partials/copyright.html", "(c) 2026")
+        cache = BuildCache(self.path("cache.json"))
+        self.assertEqual(generate_pages_recursive(content, self.template, dest, cache), 1)
+        with open(os.path.join(dest, "index.html"), encoding="utf-8") as file:
+            self.assertIn("(c) 2026", file.read())
+
+if __name__ == "__main__":
+    unittest.main()
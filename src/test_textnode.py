@@ -27,6 +27,10 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("This is a text node", TextType.BOLD)
         self.assertEqual(node.url, None)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_diff_text(self):
         node = TextNode("This is a text node", TextType.BOLD)
         node2 = TextNode("This is not a text node", TextType.BOLD)
@@ -2,6 +2,8 @@ from enums import *
 from htmlnode import LeafNode
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -17,26 +19,56 @@ class TextNode():
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
     
+class SpanTextNode():
+    #Interchangeable with TextNode, but the text is kept as (start, end)
+    #offsets into the source (a str or a memoryview of utf-8 bytes) and
+    #is only copied out when it is read
+    __slots__ = ("source", "start", "end", "text_type", "url")
+
+    def __init__(self, source, start, end, text_type, url=None):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.text_type = text_type
+        self.url = url
+
+    @property
+    def text(self):
+        if isinstance(self.source, str):
+            return self.source[self.start:self.end]
+        return str(self.source[self.start:self.end], "utf-8")
+
+    def __eq__(self, second_node):
+        return (
+            self.text == second_node.text and
+            self.text_type == second_node.text_type and
+            self.url == second_node.url
+        )
+
+    def __repr__(self):
+        return f"SpanTextNode({self.text}, {self.text_type.value}, {self.url})"
+
 def text_node_to_html_node(text_node):
-    if text_node.text is None and text_node.text_type != TextType.IMAGE:
+    text = text_node.text #Read once, a SpanTextNode copies it out on every read
+    if text is None and text_node.text_type != TextType.IMAGE:
         raise ValueError("TextNode value cannot be None for non-IMAGE types.")
 
     match text_node.text_type:
         case TextType.TEXT:
-            return LeafNode(None, text_node.text)
+            return LeafNode(None, text)
         case TextType.BOLD:
-            return LeafNode("b", text_node.text)
+            return LeafNode("b", text)
         case TextType.ITALIC:
-            return LeafNode("i", text_node.text)
+            return LeafNode("i", text)
         case TextType.CODE:
-            return LeafNode("code", text_node.text)
+            return LeafNode("code", text)
         case TextType.LINK:
             if text_node.url is None or text_node.url == "":
                 raise ValueError("TextNode of type LINK must have a valid url.")
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            return LeafNode("a", text, {"href": text_node.url})
         case TextType.IMAGE:
             if text_node.url is None or text_node.url == "":
                 raise ValueError("TextNode of type IMAGE must have a valid url.")
-            return LeafNode("img", "", {"src": text_node.url ,"alt": text_node.text})
+            return LeafNode("img", "", {"src": text_node.url ,"alt": text})
         case _:
             raise TypeError("unexpected text type")
\ No newline at end of file